@@ -0,0 +1,4 @@
+from .registry import (COMBOS, STT_PROVIDERS, LLM_PROVIDERS, TTS_PROVIDERS,
+                       Combo, build_combo, get_stt, get_llm, get_tts, get_speech,
+                       warm_all, close_all)
+from .runtime import Runtime, QueueSink, console_sink
@@ -0,0 +1,61 @@
+import argparse
+
+from .registry import COMBOS, warm_all
+from .runtime import Runtime, console_sink
+
+
+# === CLI: run any combo (or several) in one warm process ===
+def main():
+    parser = argparse.ArgumentParser(prog="python -m core",
+                                     description="Run voice-agent combos from the shared registry")
+    parser.add_argument("combos", nargs="*", help="combo ids, e.g. 26 561 952")
+    parser.add_argument("--list", action="store_true", help="list known combos")
+    parser.add_argument("--turns", type=int, default=1, help="turns per combo")
+    parser.add_argument("--warm", action="store_true", help="pre-warm every combo before the first turn")
+    parser.add_argument("--gui", action="store_true", help="open the Tk window for the first combo")
+    parser.add_argument("--quiet", action="store_true",
+                        help="benchmark mode: print timings only, no transcripts or replies")
+    args = parser.parse_args()
+
+    if args.list or not args.combos:
+        for combo_id, (s, l, t) in COMBOS.items():
+            print(f"{combo_id:>6}  STT={s:<10} LLM={l:<26} TTS={t}")
+        return
+
+    if args.warm:
+        warm_all(args.combos)
+
+    runtime = Runtime()
+    if args.gui:
+        from .gui import VoiceApp
+        try:
+            VoiceApp(runtime, args.combos[0]).run()
+        finally:
+            runtime.close()
+        return
+
+    if not args.quiet:
+        runtime.subscribe(console_sink)
+    results = {}
+    try:
+        for combo_id in args.combos:
+            combo = runtime.combo(combo_id)
+            print(f"\n🎛 Combo {combo.id}: {combo.label}")
+            for _ in range(args.turns):
+                transcript, reply, timings = runtime.run_turn(combo.id)
+                results.setdefault(combo.id, []).append(timings)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
+    finally:
+        runtime.close()
+
+    if len(results) > 1:
+        print("\n📊 Comparison (mean seconds)")
+        for combo_id, runs in results.items():
+            keys = ("stt", "llm", "tts", "eos_to_first_audio", "total")
+            means = {k: sum(r.get(k, 0.0) for r in runs) / len(runs) for k in keys}
+            print(f"{combo_id:>6}  " + "  ".join(f"{k}={means[k]:.2f}" for k in keys))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import io
+import struct
+import wave
+
+from . import capture
+from .config import (SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH,
+                     MAX_RECORD_SECONDS, NO_SPEECH_SECONDS)
+from .vad import VAD, SPEECH, END
+
+
+# === VAD-endpointed capture ===
+# Records until the speaker stops (hangover elapsed) instead of a fixed
+# window. Audio from just before onset is kept so the first syllable is
+# not clipped. `on_frame` receives the utterance as it is captured (the
+# pre-roll in one piece at onset, then each chunk), e.g. to upload it while
+# the user is still talking; views are only valid until the ring wraps, so
+# copy them if you keep them.
+def record_utterance(stop=None, vad=None, max_seconds=MAX_RECORD_SECONDS,
+                     no_speech_seconds=NO_SPEECH_SECONDS, on_frame=None):
+    vad = vad or VAD()
+    vad.reset()
+    engine = capture.get_engine()
+    reader = engine.reader()
+    vad.prime(engine.before(reader.pos, vad.window_ms))
+    chunk_s = engine.chunk / SAMPLE_RATE
+    preroll_bytes = int(vad.preroll_ms / 1000 * SAMPLE_RATE) * SAMPLE_WIDTH * CHANNELS
+    onset = None
+    waited = 0.0
+
+    while True:
+        if stop is not None and stop.is_set():
+            print("⛔ Recording stopped")
+            return None
+        data = reader.read(engine.chunk_bytes)
+        if data is None:
+            print("🔴 Microphone stalled:", engine.report())
+            break
+        state = vad.feed(data)
+        if onset is None:
+            if state != SPEECH:
+                waited += chunk_s
+                if waited >= no_speech_seconds:
+                    print("🔇 No speech detected")
+                    return None
+                continue
+            onset = max(engine.ring.oldest(), reader.pos - engine.chunk_bytes - preroll_bytes)
+            if on_frame:
+                on_frame(engine.ring.slice(onset, reader.pos))
+            continue
+        if on_frame:
+            on_frame(data)
+        if state == END or (reader.pos - onset) / engine.chunk_bytes * chunk_s >= max_seconds:
+            break
+    if onset is None:
+        return None
+    return AudioClip(bytes(engine.ring.slice(max(onset, engine.ring.oldest()), reader.pos)))
+
+
+# === In-memory audio ===
+# Raw PCM plus format; the WAV header is generated on demand, so STT
+# adapters get a file-like object or bytes without touching the disk.
+class AudioClip:
+    def __init__(self, pcm, rate=SAMPLE_RATE, channels=CHANNELS, width=SAMPLE_WIDTH):
+        self.pcm = pcm
+        self.rate = rate
+        self.channels = channels
+        self.width = width
+
+    @classmethod
+    def from_wav(cls, data):
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            return cls(wf.readframes(wf.getnframes()), wf.getframerate(),
+                       wf.getnchannels(), wf.getsampwidth())
+
+    def __len__(self):
+        return len(self.pcm)
+
+    def __bool__(self):
+        return len(self.pcm) > 0
+
+    @property
+    def duration(self):
+        return len(self.pcm) / (self.rate * self.channels * self.width)
+
+    def wav_header(self):
+        size = len(self.pcm)
+        byte_rate = self.rate * self.channels * self.width
+        return struct.pack("<4sI4s4sIHHIIHH4sI",
+                           b"RIFF", 36 + size, b"WAVE",
+                           b"fmt ", 16, 1, self.channels, self.rate, byte_rate,
+                           self.channels * self.width, self.width * 8,
+                           b"data", size)
+
+    # Header for a WAV of unknown length, for chunked uploads that start
+    # before recording ends. Decoders read to end of stream.
+    @staticmethod
+    def stream_header(rate=SAMPLE_RATE, channels=CHANNELS, width=SAMPLE_WIDTH):
+        return struct.pack("<4sI4s4sIHHIIHH4sI",
+                           b"RIFF", 0xFFFFFFFF, b"WAVE",
+                           b"fmt ", 16, 1, channels, rate, rate * channels * width,
+                           channels * width, width * 8,
+                           b"data", 0xFFFFFFFF)
+
+    def wav_bytes(self):
+        return self.wav_header() + self.pcm
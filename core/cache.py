@@ -0,0 +1,493 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+from .audio import AudioClip
+from .config import (TTS_CACHE_DIR, TTS_CACHE_MEMORY_MB, TTS_CACHE_DISK_MB,
+                     LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_PATH, SEMANTIC_CACHE,
+                     SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_DIM,
+                     SEMANTIC_CACHE_MODEL, SEMANTIC_CACHE_DIR)
+
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+# Looser than normalize_text: case and surrounding punctuation do not
+# change what a user asked.
+def normalize_prompt(text):
+    return normalize_text(text).lower().strip(" .,!?;:…\"'")
+
+
+def _hash(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+# === TTS audio cache ===
+# Content addressed: the key is a hash of (backend, voice, sample rate,
+# normalized text). A byte-bounded LRU in memory sits in front of a WAV
+# directory on disk with its own byte budget (oldest-used files go first).
+class TTSCache:
+    def __init__(self, directory=TTS_CACHE_DIR, memory_bytes=TTS_CACHE_MEMORY_MB << 20,
+                 disk_bytes=TTS_CACHE_DISK_MB << 20):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        self._disk = OrderedDict()
+        self._disk_used = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0,
+                      "evictions": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._scan()
+
+    @staticmethod
+    def key(tts, text):
+        return _hash(tts.name, getattr(tts, "voice", ""), str(getattr(tts, "rate", "")),
+                     normalize_text(text))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".wav")
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".wav"):
+                st = os.stat(os.path.join(self.directory, name))
+                entries.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_used += size
+        self._trim_disk()
+
+    def get(self, key):
+        with self._lock:
+            clip = self._memory.get(key)
+            if clip is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return clip
+            on_disk = key in self._disk
+            if on_disk:
+                self._disk.move_to_end(key)
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as f:
+                    clip = AudioClip.from_wav(f.read())
+                os.utime(self._path(key))
+            except (OSError, EOFError) as e:
+                print("🔴 TTS Cache Error:", e)
+                with self._lock:
+                    self._disk_used -= self._disk.pop(key, 0)
+            else:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                    self._remember(key, clip)
+                return clip
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, clip):
+        if not clip:
+            return
+        with self._lock:
+            self.stats["stores"] += 1
+            self._remember(key, clip)
+            if not self.directory or key in self._disk:
+                return
+        data = clip.wav_bytes()
+        tmp = self._path(key) + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            print("🔴 TTS Cache Error:", e)
+            return
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = len(data)
+                self._disk_used += len(data)
+                self._trim_disk()
+
+    def _remember(self, key, clip):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = clip
+        self._memory_used += len(clip)
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_used -= len(old)
+            self.stats["evictions"] += 1
+
+    def _trim_disk(self):
+        while self._disk_used > self.disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_used -= size
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    # Returns the cached clip or synthesizes, stores and returns it.
+    def synthesize(self, tts, text):
+        key = self.key(tts, text)
+        clip = self.get(key)
+        if clip is None:
+            clip = tts.synthesize(text)
+            self.put(key, clip)
+        return clip
+
+    def report(self):
+        s = self.stats
+        return (f"hits memory={s['memory_hits']} disk={s['disk_hits']} misses={s['misses']} "
+                f"stores={s['stores']} evictions={s['evictions']} "
+                f"memory={self._memory_used / 1e6:.1f}MB disk={self._disk_used / 1e6:.1f}MB")
+
+
+# === LLM response cache ===
+# Exact match on (provider, model, normalized prompt, context hash), where
+# the context covers the system prompt and any conversation history. An
+# LRU of `size` entries, each valid for `ttl` seconds; with `path`, entries
+# are also kept in SQLite so they survive restarts.
+class ResponseCache:
+    def __init__(self, size=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL, path=LLM_CACHE_PATH):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.db = None
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS replies "
+                            "(key TEXT PRIMARY KEY, reply TEXT, created REAL)")
+            self.db.execute("DELETE FROM replies WHERE created < ?", (time.time() - ttl,))
+            self.db.commit()
+
+    @staticmethod
+    def key(provider, model, prompt, context=""):
+        return _hash(provider, model or "", normalize_prompt(prompt),
+                     _hash(context) if context else "")
+
+    def _load(self, key):
+        if self.db is None:
+            return None
+        return self.db.execute("SELECT reply, created FROM replies WHERE key = ?",
+                               (key,)).fetchone()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key) or self._load(key)
+            if entry is not None and now - entry[1] > self.ttl:
+                self.stats["expired"] += 1
+                self._entries.pop(key, None)
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._remember(key, entry)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key, reply):
+        if not reply:
+            return
+        entry = (reply, time.time())
+        with self._lock:
+            self.stats["stores"] += 1
+            self._remember(key, entry)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO replies VALUES (?, ?, ?)",
+                                (key, *entry))
+                self.db.commit()
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def report(self):
+        s = self.stats
+        return (f"hits={s['hits']} misses={s['misses']} hit_rate={self.hit_rate():.0%} "
+                f"expired={s['expired']} stores={s['stores']} evictions={s['evictions']} "
+                f"entries={len(self._entries)}")
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+# === Semantic LLM cache ===
+# Embeddings come from a local sentence-transformers model when the package
+# is installed. Otherwise a dependency-free fallback is used: signed feature
+# hashing of words, their character trigrams and content-word bigrams,
+# L2-normalized, with function words down-weighted so "what's the capital of
+# france" and "tell me the capital of France" land together. The fallback
+# is lexical, so it only catches rephrasings that share most of their words.
+STOP_WORDS = {"a", "an", "and", "are", "be", "can", "could", "do", "does", "for", "how",
+              "i", "in", "is", "it", "me", "my", "of", "on", "please", "s", "tell", "the",
+              "to", "was", "what", "whats", "will", "would", "you"}
+
+
+class HashEmbedder:
+    def __init__(self, dim=SEMANTIC_CACHE_DIM):
+        self.dim = dim
+        self.name = f"hash{dim}"
+
+    def _features(self, text):
+        words = re.findall(r"\w+", normalize_prompt(text))
+        for w in words:
+            weight = 0.25 if w in STOP_WORDS else 1.0
+            yield w, weight
+            padded = f"#{w}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3], weight / 2
+        content = [w for w in words if w not in STOP_WORDS]
+        for a, b in zip(content, content[1:]):
+            yield f"{a} {b}", 0.5
+
+    def __call__(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            vec[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+
+class SentenceEmbedder:
+    def __init__(self, model=SEMANTIC_CACHE_MODEL):
+        self.model = SentenceTransformer(model)
+        self.name = re.sub(r"\W+", "-", model)
+
+    def __call__(self, text):
+        vec = self.model.encode(normalize_prompt(text), normalize_embeddings=True)
+        return np.asarray(vec, dtype=np.float32)
+
+
+def default_embedder():
+    if SentenceTransformer is not None:
+        try:
+            return SentenceEmbedder()
+        except Exception as e:
+            print("🔴 Embedding model unavailable, using hashed features:", e)
+    return HashEmbedder()
+
+
+# Words that flip or quantify an answer while barely moving an embedding.
+NUMBER_WORDS = {"zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+                "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+                "seventeen", "eighteen", "nineteen", "twenty", "thirty", "forty", "fifty",
+                "sixty", "seventy", "eighty", "ninety", "hundred", "thousand", "million",
+                "billion", "first", "second", "third", "fourth", "fifth", "half", "once",
+                "twice", "double", "triple"}
+NEGATIONS = {"no", "not", "never", "none", "nothing", "nobody", "nowhere", "neither", "nor",
+             "without", "cannot", "t"}      # "t" is what's left of "don't", "isn't", ...
+
+
+# Embeddings live in one contiguous float32 matrix (a memmap when `path` is
+# set); a lookup is a single matrix-vector product over the filled rows.
+# Once `capacity` rows are used the oldest row is overwritten. A reply only
+# matches within its scope: same provider, model, context, the same numbers
+# (digits or spelled out) and the same negations, so "type one"/"type two"
+# or "with"/"without spinach" never share an answer. Within a scope the
+# embedding decides, so paraphrases ("height of Mount Everest" / "how tall
+# is Mount Everest") can match.
+class SemanticCache:
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, capacity=SEMANTIC_CACHE_SIZE,
+                 ttl=LLM_CACHE_TTL, path=SEMANTIC_CACHE_DIR, embed=None):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+        self.path = path
+        self.embed = embed or default_embedder()
+        self.dim = len(self.embed("probe"))
+        self.count = 0
+        self.scopes = np.zeros(capacity, dtype=np.int64)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.entries = [None] * capacity
+        self._lock = threading.Lock()
+        self._log = None
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "last_score": 0.0}
+        if path:
+            # One matrix and log per embedder: vectors from another model
+            # (or width) are not comparable.
+            os.makedirs(path, exist_ok=True)
+            tag = getattr(self.embed, "name", "custom")
+            vectors = os.path.join(path, f"vectors-{tag}.f32")
+            entries = os.path.join(path, f"entries-{tag}.jsonl")
+            mode = "r+" if os.path.exists(vectors) else "w+"
+            self.matrix = np.memmap(vectors, dtype=np.float32, mode=mode,
+                                    shape=(capacity, self.dim))
+            self._load(entries)
+            self._log = open(entries, "a", encoding="utf-8")
+        else:
+            self.matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+
+    @staticmethod
+    def scope(provider, model, prompt, context=""):
+        words = re.findall(r"\w+", normalize_prompt(prompt))
+        guard = [w for w in words if w.isdigit() or w in NUMBER_WORDS]
+        guard += sorted({"not" if w == "t" else w for w in words if w in NEGATIONS})
+        digest = _hash(provider, model or "", context, " ".join(guard))
+        return int(digest[:15], 16)
+
+    def _load(self, log_path):
+        if not os.path.exists(log_path):
+            return
+        lines = 0
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    slot, scope, reply, created = json.loads(line)
+                except ValueError:
+                    continue
+                lines += 1
+                if slot < self.capacity:
+                    self.scopes[slot] = scope
+                    self.created[slot] = created
+                    self.entries[slot] = reply
+                    self.count = max(self.count, slot + 1)
+        if lines > 2 * self.capacity:
+            # Compact the log so it holds one line per live row.
+            tmp = log_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for slot in range(self.count):
+                    f.write(json.dumps([slot, int(self.scopes[slot]), self.entries[slot],
+                                        float(self.created[slot])]) + "\n")
+            os.replace(tmp, log_path)
+
+    def size(self):
+        return self.count
+
+    def get(self, scope, prompt):
+        query = self.embed(prompt)
+        with self._lock:
+            n = self.size()
+            if n:
+                scores = self.matrix[:n] @ query
+                scores[self.scopes[:n] != scope] = -1.0
+                scores[self.created[:n] < time.time() - self.ttl] = -1.0
+                best = int(np.argmax(scores))
+                score = float(scores[best])
+                self.stats["last_score"] = score
+                if score >= self.threshold:
+                    self.stats["hits"] += 1
+                    return self.entries[best]
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, scope, prompt, reply):
+        if not reply:
+            return
+        vec = self.embed(prompt)
+        created = time.time()
+        with self._lock:
+            if self.count < self.capacity:
+                slot = self.count
+                self.count += 1
+            else:
+                slot = int(np.argmin(self.created))
+            self.matrix[slot] = vec
+            self.scopes[slot] = scope
+            self.created[slot] = created
+            self.entries[slot] = reply
+            self.stats["stores"] += 1
+            if self._log is not None:
+                self._log.write(json.dumps([slot, scope, reply, created]) + "\n")
+                self._log.flush()
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def report(self):
+        s = self.stats
+        return (f"hits={s['hits']} misses={s['misses']} hit_rate={self.hit_rate():.0%} "
+                f"threshold={self.threshold:.2f} last_score={s['last_score']:.2f} "
+                f"index={self.size()}x{self.dim} ({self.matrix.nbytes / 1e6:.1f}MB)")
+
+    def close(self):
+        if isinstance(self.matrix, np.memmap):
+            self.matrix.flush()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+# === Process-wide caches ===
+_tts_cache = None
+_response_cache = None
+_semantic_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache():
+    global _tts_cache
+    with _cache_lock:
+        if _tts_cache is None:
+            _tts_cache = TTSCache()
+        return _tts_cache
+
+
+def get_response_cache():
+    global _response_cache
+    with _cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+
+def get_semantic_cache():
+    global _semantic_cache
+    if not SEMANTIC_CACHE:
+        return None
+    with _cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache()
+        return _semantic_cache
+
+
+def shutdown():
+    global _tts_cache, _response_cache, _semantic_cache
+    with _cache_lock:
+        if _tts_cache is not None:
+            print("🗄 TTS cache stats:", _tts_cache.report())
+            _tts_cache = None
+        if _response_cache is not None:
+            print("🗄 LLM cache stats:", _response_cache.report())
+            _response_cache.close()
+            _response_cache = None
+        if _semantic_cache is not None:
+            print("🗄 Semantic cache stats:", _semantic_cache.report())
+            _semantic_cache.close()
+            _semantic_cache = None
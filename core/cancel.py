@@ -0,0 +1,130 @@
+import io
+import threading
+import time
+from contextlib import contextmanager
+
+# Work that cancellation avoided, summed over the process.
+_totals = {}
+_totals_lock = threading.Lock()
+
+
+# === Cancellation tokens ===
+# A per-turn token that every stage receives as its `stop`. It is a drop-in
+# for threading.Event (is_set / wait / set), so code that only polls keeps
+# working, but stages holding something blocking (an HTTP body, a
+# websocket, a synthesizer) also register a callback that aborts it the
+# moment the token is cancelled instead of at the next poll. Child tokens
+# are cancelled with their parent.
+class CancelToken:
+    def __init__(self, parent=None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._next = 0
+        self.reason = None
+        self.cancelled_at = None
+        self.saved = {}
+        if parent is not None:
+            parent.on_cancel(lambda: self.cancel(parent.reason))
+
+    def is_set(self):
+        return self._event.is_set()
+
+    cancelled = is_set
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    def cancel(self, reason="stop"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self.cancelled_at = time.perf_counter()
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print("🔴 Cancel Error:", e)
+
+    set = cancel
+
+    # Runs `callback` on cancel (immediately if already cancelled); returns
+    # a handle for remove().
+    def on_cancel(self, callback):
+        with self._lock:
+            if not self._event.is_set():
+                self._next += 1
+                self._callbacks[self._next] = callback
+                return self._next
+        callback()
+        return None
+
+    def remove(self, handle):
+        with self._lock:
+            self._callbacks.pop(handle, None)
+
+    def child(self):
+        return CancelToken(self)
+
+
+# Registers `callback` on `stop` for the duration of the block. Plain
+# threading.Events (or None) are accepted and simply not hooked.
+@contextmanager
+def scope(stop, callback):
+    if not isinstance(stop, CancelToken):
+        yield stop
+        return
+    handle = stop.on_cancel(callback)
+    try:
+        yield stop
+    finally:
+        if handle is not None:
+            stop.remove(handle)
+
+
+def is_cancelled(stop):
+    return stop is not None and stop.is_set()
+
+
+# Raised from inside an I/O call to abort it once the token has fired.
+class Cancelled(Exception):
+    pass
+
+
+class _Body(io.BytesIO):
+    def __init__(self, data, stop):
+        super().__init__(data)
+        self.stop = stop
+
+    def read(self, size=-1):
+        if self.stop.is_set():
+            raise Cancelled(self.stop.reason)
+        return super().read(size)
+
+
+# Request body for an upload that should stop mid-way on cancel: the HTTP
+# client reads it in blocks, and the first read after the token fires
+# aborts the request. Length is known, so Content-Length is still sent.
+def body(data, stop):
+    return _Body(data, stop) if isinstance(stop, CancelToken) else data
+
+
+# Counts work skipped because of a cancel, e.g. record(stop, "tts_segments").
+def record(stop, key, amount=1):
+    if isinstance(stop, CancelToken):
+        with stop._lock:
+            stop.saved[key] = stop.saved.get(key, 0) + amount
+    with _totals_lock:
+        _totals[key] = _totals.get(key, 0) + amount
+
+
+def report():
+    with _totals_lock:
+        if not _totals:
+            return "nothing cancelled"
+        return " ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+                        for k, v in sorted(_totals.items()))
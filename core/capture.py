@@ -0,0 +1,176 @@
+import threading
+import time
+
+from . import devices
+from .config import SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH, CHUNK, RING_SECONDS
+
+
+# === Preallocated ring buffer ===
+# Positions are absolute byte counts since start, so a reader knows exactly
+# how far behind the writer it is. Capacity is a whole number of chunks and
+# writes are chunk-sized, so chunk-aligned reads never straddle the wrap.
+class RingBuffer:
+    def __init__(self, capacity, align=CHUNK * SAMPLE_WIDTH * CHANNELS):
+        self.capacity = max(align, capacity // align * align)
+        self.buf = bytearray(self.capacity)
+        self.view = memoryview(self.buf)
+        self.written = 0
+        self.cond = threading.Condition()
+
+    def write(self, data):
+        n = len(data)
+        if n > self.capacity:
+            data = data[-self.capacity:]
+            n = self.capacity
+        with self.cond:
+            pos = self.written % self.capacity
+            first = min(n, self.capacity - pos)
+            self.view[pos:pos + first] = data[:first]
+            if n > first:
+                self.view[:n - first] = data[first:]
+            self.written += n
+            self.cond.notify_all()
+
+    def oldest(self):
+        return max(0, self.written - self.capacity)
+
+    def slice(self, start, end):
+        # Zero-copy when the range is contiguous; a copy only across the wrap.
+        if start < self.oldest() or end > self.written or start > end:
+            raise IndexError("range no longer in ring")
+        a = start % self.capacity
+        b = a + (end - start)
+        if b <= self.capacity:
+            return self.view[a:b]
+        return memoryview(bytes(self.view[a:]) + bytes(self.view[:b - self.capacity]))
+
+
+# === Reader cursor ===
+class Reader:
+    def __init__(self, engine, pos):
+        self.engine = engine
+        self.ring = engine.ring
+        self.pos = pos
+
+    def read(self, nbytes, timeout=1.0):
+        ring = self.ring
+        with ring.cond:
+            if not ring.cond.wait_for(lambda: ring.written - self.pos >= nbytes, timeout):
+                # Mic delivered nothing in time: the device stalled or stopped.
+                self.engine.stats["reader_underruns"] += 1
+                return None
+            if self.pos < ring.oldest():
+                # Consumer fell a full ring behind; skip ahead and count the loss.
+                self.engine.stats["reader_overruns"] += 1
+                self.engine.stats["lost_bytes"] += ring.oldest() - self.pos
+                self.pos = ring.oldest()
+            view = ring.slice(self.pos, self.pos + nbytes)
+        self.pos += nbytes
+        return view
+
+
+# === Capture engine ===
+# The device manager delivers chunks through a callback into the ring;
+# nothing is allocated per chunk after start-up. Overflow/underflow flags
+# reported by PortAudio are counted instead of being silently dropped.
+class CaptureEngine:
+    def __init__(self, rate=SAMPLE_RATE, chunk=CHUNK, seconds=RING_SECONDS):
+        self.rate = rate
+        self.chunk = chunk
+        self.chunk_bytes = chunk * SAMPLE_WIDTH * CHANNELS
+        self.ring = RingBuffer(int(rate * seconds) * SAMPLE_WIDTH * CHANNELS, self.chunk_bytes)
+        self.stream = None
+        self._last = None
+        self.resume = None
+        self.stats = {
+            "chunks": 0,
+            "mic_overruns": 0,
+            "mic_underruns": 0,
+            "reader_overruns": 0,
+            "reader_underruns": 0,
+            "lost_bytes": 0,
+            "max_gap_ms": 0.0,
+        }
+
+    @property
+    def running(self):
+        return self.stream is not None and self.stream.is_active()
+
+    def _callback(self, in_data, overflow, underflow):
+        if overflow:
+            self.stats["mic_overruns"] += 1
+        if underflow:
+            self.stats["mic_underruns"] += 1
+        now = time.perf_counter()
+        if self._last is not None:
+            gap = (now - self._last) * 1000
+            if gap > self.stats["max_gap_ms"]:
+                self.stats["max_gap_ms"] = gap
+        self._last = now
+        self.ring.write(in_data)
+        self.stats["chunks"] += 1
+
+    def start(self):
+        if self.running:
+            return self
+        self.stream = devices.get_devices().open_input(self.rate, CHANNELS, self.chunk,
+                                                       self._callback)
+        return self
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        self._last = None
+
+    def reader(self, from_now=True):
+        if not from_now:
+            return Reader(self, self.ring.oldest())
+        resume = self.resume
+        if resume is not None:
+            return Reader(self, max(resume, self.ring.oldest()))
+        return Reader(self, self.ring.written)
+
+    # Up to `ms` of audio captured before `pos`, e.g. to prime a VAD's noise floor.
+    def before(self, pos, ms):
+        n = int(ms / 1000 * self.rate) * SAMPLE_WIDTH * CHANNELS
+        return self.ring.slice(max(self.ring.oldest(), pos - n), pos)
+
+    # Barge-in: audio from `pos` on belongs to the next turn. Until cleared,
+    # "from now" readers start there instead of at the live edge, so the
+    # interrupting words are not lost.
+    def resume_from(self, pos):
+        self.resume = pos - pos % self.chunk_bytes
+
+    def clear_resume(self):
+        self.resume = None
+
+    def report(self):
+        s = self.stats
+        return (f"chunks={s['chunks']} mic_overruns={s['mic_overruns']} "
+                f"mic_underruns={s['mic_underruns']} reader_overruns={s['reader_overruns']} "
+                f"reader_underruns={s['reader_underruns']} lost={s['lost_bytes']}B "
+                f"max_gap={s['max_gap_ms']:.1f}ms")
+
+
+# === Process-wide engine ===
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = CaptureEngine()
+        return _engine.start()
+
+
+def shutdown():
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            print("🎙 Capture stats:", _engine.report())
+            _engine.stop()
+            _engine = None
@@ -0,0 +1,88 @@
+import os
+from dotenv import load_dotenv
+
+# === Load API keys ===
+load_dotenv()
+AZURE_SPEECH_KEY   = os.getenv("AZURE_SPEECH_KEY") or os.getenv("AZURE_TTS_KEY")
+AZURE_REGION       = os.getenv("AZURE_REGION")
+DEEPGRAM_API_KEY   = os.getenv("DEEPGRAM_API_KEY")
+ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY") or os.getenv("ASSEMBLY_API_KEY")
+OPENAI_API_KEY     = os.getenv("OPENAI_API_KEY")
+GEMINI_API_KEY     = os.getenv("GEMINI_API_KEY")
+COHERE_API_KEY     = os.getenv("COHERE_API_KEY")
+GROQ_API_KEY       = os.getenv("GROQ_API_KEY")
+
+# === Audio settings ===
+SAMPLE_RATE        = 16000
+CHANNELS           = 1
+SAMPLE_WIDTH       = 2      # paInt16
+CHUNK              = 1024
+MAX_RECORD_SECONDS = 15     # hard cap for VAD-endpointed capture
+NO_SPEECH_SECONDS  = 5      # give up if nobody starts talking
+RING_SECONDS       = 30     # capture ring size; bounds memory per session
+
+# === Audio devices ===
+AUDIO_BACKEND     = os.getenv("AUDIO_BACKEND", "pyaudio")   # pyaudio | null | file
+AUDIO_INPUT_FILE  = os.getenv("AUDIO_INPUT_FILE")           # file backend mic source
+AUDIO_OUTPUT_FILE = os.getenv("AUDIO_OUTPUT_FILE")          # file backend speaker sink
+JITTER_MS         = 120     # audio buffered before streamed playback starts
+
+# === Voice activity detection ===
+VAD_THRESHOLD_DB  = -45     # dBFS floor for speech
+VAD_MARGIN_DB     = 12      # speech must be this far above the noise floor
+VAD_HANGOVER_MS   = 700     # trailing silence that ends a turn
+VAD_PREROLL_MS    = 300     # audio kept from before speech onset
+VAD_MIN_SPEECH_MS = 120     # ignore clicks shorter than this
+VAD_NOISE_WINDOW_MS = 3000  # noise floor = low percentile of this much recent audio
+
+# === Barge-in ===
+BARGE_IN               = os.getenv("BARGE_IN", "0") == "1"  # full duplex; use headphones or AEC
+BARGE_IN_MARGIN_DB     = 6     # speech must be this far above our own playback echo
+BARGE_IN_ECHO_MS       = 400   # playback heard before the echo level is fixed
+BARGE_IN_MIN_SPEECH_MS = 250   # speech needed to interrupt; shorter blips are ignored
+
+# === Streaming STT ===
+DEEPGRAM_ENDPOINTING_MS = 300   # silence Deepgram waits before speech_final
+ASSEMBLYAI_POLL_BUDGET  = 30    # max seconds to wait for a batch transcript
+
+# === TTS pipeline ===
+TTS_LOOKAHEAD       = 2     # segments synthesized ahead of playback
+TTS_FIRST_MAX_CHARS = 60    # keep the first segment short for fast first audio
+TTS_MAX_CHARS       = 200   # longer sentences are split at clauses
+TTS_MIN_CHARS       = 8     # do not cut segments shorter than this
+
+# === Turn pipeline ===
+PIPELINE_QUEUE_SIZE = 64    # LLM deltas buffered ahead of the TTS stage
+PARTIAL_QUEUE_SIZE  = 8     # interim transcripts; oldest dropped when full
+
+# === TTS cache ===
+TTS_CACHE_DIR       = os.getenv("TTS_CACHE_DIR",                 # empty disables the disk tier
+                                os.path.join(os.path.expanduser("~"), ".cache", "voice-combos", "tts"))
+TTS_CACHE_MEMORY_MB = 32    # in-memory LRU budget
+TTS_CACHE_DISK_MB   = 256   # on-disk budget
+
+# === LLM cache ===
+LLM_CACHE_SIZE = 256        # replies kept in memory
+LLM_CACHE_TTL  = 3600       # seconds a cached reply stays valid
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")    # SQLite file; unset keeps the cache in memory
+
+# === Semantic LLM cache ===
+SEMANTIC_CACHE           = os.getenv("SEMANTIC_CACHE", "0") == "1"  # opt-in: may reuse a near-miss reply
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))  # cosine similarity
+SEMANTIC_CACHE_SIZE      = 4096     # rows in the embedding matrix
+SEMANTIC_CACHE_DIM       = 512      # hashed embedding width
+SEMANTIC_CACHE_MODEL     = os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")  # sentence-transformers, if installed
+SEMANTIC_CACHE_DIR       = os.getenv("SEMANTIC_CACHE_DIR")  # memmap + entry log; unset keeps it in memory
+
+# === Conversation memory ===
+MEMORY_TOKEN_BUDGET = 1500  # system prompt + summary + history, excluding the new turn
+MEMORY_MAX_TURNS    = 10    # hard cap on remembered turns
+MEMORY_SUMMARIZE    = os.getenv("MEMORY_SUMMARIZE", "0") == "1"  # fold evicted turns into a summary
+
+# === GUI ===
+GUI_FPS     = 30            # frames per second the Tk front-end renders batched events at
+
+# === Defaults ===
+SYSTEM_PROMPT  = "You are a helpful assistant."
+AZURE_VOICE    = "en-US-JennyNeural"
+DEEPGRAM_VOICE = "aura-asteria-en"
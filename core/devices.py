@@ -0,0 +1,397 @@
+import queue
+import threading
+import time
+import wave
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+from . import cancel
+from .config import (SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH, AUDIO_BACKEND,
+                     AUDIO_INPUT_FILE, AUDIO_OUTPUT_FILE, JITTER_MS)
+
+PLAY_CHUNK_SECONDS = 0.1
+
+
+# === PyAudio backend ===
+# One PortAudio instance for the whole process. Input is callback driven
+# (feeds the capture ring); output is a blocking stream kept open.
+class PyAudioBackend:
+    name = "pyaudio"
+
+    def __init__(self):
+        self.pa = pyaudio.PyAudio()
+
+    def open_input(self, rate, channels, chunk, callback):
+        def _cb(in_data, frame_count, time_info, status):
+            callback(in_data,
+                     bool(status & pyaudio.paInputOverflow),
+                     bool(status & pyaudio.paInputUnderflow))
+            return None, pyaudio.paContinue
+        stream = self.pa.open(format=pyaudio.paInt16, channels=channels, rate=rate,
+                              input=True, frames_per_buffer=chunk, stream_callback=_cb)
+        stream.start_stream()
+        return stream
+
+    def open_output(self, rate, channels):
+        return _PyAudioOutput(self.pa.open(format=pyaudio.paInt16, channels=channels,
+                                           rate=rate, output=True))
+
+    def terminate(self):
+        self.pa.terminate()
+
+
+class _PyAudioOutput:
+    def __init__(self, stream):
+        self.stream = stream
+
+    @property
+    def latency(self):
+        return self.stream.get_output_latency()
+
+    def is_active(self):
+        return self.stream.is_active()
+
+    # Returns True when PortAudio reported an output underflow (a gap).
+    def write(self, pcm, check_underflow=True):
+        try:
+            self.stream.write(bytes(pcm), exception_on_underflow=check_underflow)
+        except IOError as e:
+            if pyaudio is not None and getattr(e, "errno", None) == pyaudio.paOutputUnderflowed:
+                return True
+            raise
+        return False
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+
+
+# === Null backend (headless) ===
+# Input produces silence at real-time pace; output is discarded, optionally
+# also at real-time pace so timings stay comparable with a real device.
+class NullBackend:
+    name = "null"
+
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+
+    def _source(self, rate, channels, chunk):
+        silence = bytes(chunk * channels * SAMPLE_WIDTH)
+        while True:
+            yield silence
+
+    def open_input(self, rate, channels, chunk, callback):
+        return _ThreadInput(self._source(rate, channels, chunk), chunk / rate, callback)
+
+    def open_output(self, rate, channels):
+        return _NullOutput(rate, channels, self.realtime)
+
+    def terminate(self):
+        pass
+
+
+class _ThreadInput:
+    def __init__(self, source, period, callback):
+        self._active = True
+        self._thread = threading.Thread(target=self._run, args=(source, period, callback),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, source, period, callback):
+        next_t = time.perf_counter()
+        for data in source:
+            if not self._active:
+                break
+            callback(data, False, False)
+            next_t += period
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def is_active(self):
+        return self._active
+
+    def stop_stream(self):
+        self._active = False
+
+    def close(self):
+        self._active = False
+
+
+class _NullOutput:
+    latency = 0.0
+
+    def __init__(self, rate, channels, realtime):
+        self.bytes_per_s = rate * channels * SAMPLE_WIDTH
+        self.realtime = realtime
+
+    def is_active(self):
+        return True
+
+    def write(self, pcm, check_underflow=True):
+        if self.realtime:
+            time.sleep(len(pcm) / self.bytes_per_s)
+        return False
+
+    def close(self):
+        pass
+
+
+# === File backend ===
+# Mic input comes from a WAV file (then silence); speaker output is
+# appended to a WAV file. Useful for benchmarks and CI without a sound card.
+class FileBackend(NullBackend):
+    name = "file"
+
+    def __init__(self, input_path=AUDIO_INPUT_FILE, output_path=AUDIO_OUTPUT_FILE, realtime=True):
+        super().__init__(realtime)
+        self.input_path = input_path
+        self.output_path = output_path
+
+    def _source(self, rate, channels, chunk):
+        step = chunk * channels * SAMPLE_WIDTH
+        if self.input_path:
+            with wave.open(self.input_path, "rb") as wf:
+                data = wf.readframes(wf.getnframes())
+            for i in range(0, len(data) - step + 1, step):
+                yield data[i:i + step]
+        yield from super()._source(rate, channels, chunk)
+
+    def open_output(self, rate, channels):
+        if not self.output_path:
+            return super().open_output(rate, channels)
+        return _FileOutput(self.output_path, rate, channels, self.realtime)
+
+
+class _FileOutput(_NullOutput):
+    def __init__(self, path, rate, channels, realtime):
+        super().__init__(rate, channels, realtime)
+        self.wf = wave.open(path, "wb")
+        self.wf.setnchannels(channels)
+        self.wf.setsampwidth(SAMPLE_WIDTH)
+        self.wf.setframerate(rate)
+
+    def write(self, pcm, check_underflow=True):
+        self.wf.writeframes(bytes(pcm))
+        return super().write(pcm, check_underflow)
+
+    def close(self):
+        self.wf.close()
+
+
+BACKENDS = {
+    "pyaudio": PyAudioBackend,
+    "null":    NullBackend,
+    "file":    FileBackend,
+}
+
+
+# === Device manager ===
+# Opens the backend once and keeps one output stream per (rate, channels)
+# open across turns, instead of PyAudio() + open() per utterance.
+class AudioDevices:
+    def __init__(self, backend=AUDIO_BACKEND):
+        if backend == "pyaudio" and pyaudio is None:
+            print("🔴 PyAudio not installed, using null audio backend")
+            backend = "null"
+        t0 = time.perf_counter()
+        self.backend = BACKENDS[backend]()
+        self._outputs = {}
+        self._lock = threading.Lock()
+        self.audible_until = 0.0
+        self.stats = {
+            "backend": self.backend.name,
+            "init_ms": (time.perf_counter() - t0) * 1000,
+            "inputs_opened": 0,
+            "outputs_opened": 0,
+            "outputs_reused": 0,
+            "plays": 0,
+            "played_seconds": 0.0,
+            "output_underruns": 0,
+            "first_write_ms": 0.0,
+            "errors": 0,
+        }
+
+    def open_input(self, rate, channels, chunk, callback):
+        self.stats["inputs_opened"] += 1
+        return self.backend.open_input(rate, channels, chunk, callback)
+
+    def output(self, rate=SAMPLE_RATE, channels=CHANNELS):
+        key = (rate, channels)
+        with self._lock:
+            out = self._outputs.get(key)
+            if out is not None and not out.is_active():
+                self._close_output(out)
+                out = None
+            if out is None:
+                out = self.backend.open_output(rate, channels)
+                out.lock = threading.Lock()
+                self._outputs[key] = out
+                self.stats["outputs_opened"] += 1
+            else:
+                self.stats["outputs_reused"] += 1
+            return out
+
+    # Plays in ~100 ms slices so a writer can be interrupted between slices.
+    def play(self, pcm, rate=SAMPLE_RATE, channels=CHANNELS, stop=None):
+        out = self.output(rate, channels)
+        step = int(rate * PLAY_CHUNK_SECONDS) * channels * SAMPLE_WIDTH
+        view = memoryview(pcm)
+        t0 = time.perf_counter()
+        with out.lock:
+            try:
+                for i in range(0, len(view), step):
+                    if stop is not None and stop.is_set():
+                        cancel.record(stop, "audio_seconds",
+                                      (len(view) - i) / (rate * channels * SAMPLE_WIDTH))
+                        break
+                    self._mark_audible(out, len(view[i:i + step]), rate * channels * SAMPLE_WIDTH)
+                    # Idle time between turns is not a gap; only check mid-utterance.
+                    if out.write(view[i:i + step], check_underflow=i > 0):
+                        self.stats["output_underruns"] += 1
+                    if i == 0:
+                        self.stats["first_write_ms"] = (time.perf_counter() - t0) * 1000
+            except Exception as e:
+                self.stats["errors"] += 1
+                print("🔴 Playback Error:", e)
+                with self._lock:
+                    self._outputs.pop((rate, channels), None)
+                self._close_output(out)
+                return
+        self.stats["plays"] += 1
+        self.stats["played_seconds"] += len(view) / (rate * channels * SAMPLE_WIDTH)
+
+    # Plays audio while it is still arriving (e.g. a chunked HTTP body). A
+    # feeder thread drains `chunks` into a queue; playback starts once
+    # `jitter_ms` of audio is buffered so network hiccups do not cause gaps.
+    # Returns seconds from call to first audio written, or None; `on_audio`
+    # is called at that first write.
+    def play_stream(self, chunks, rate=SAMPLE_RATE, channels=CHANNELS,
+                    jitter_ms=JITTER_MS, stop=None, on_audio=None):
+        frame = channels * SAMPLE_WIDTH
+        prebuffer = int(rate * jitter_ms / 1000) * frame
+        buf = queue.Queue()
+        done = object()
+        errors = []
+
+        def feed():
+            try:
+                for chunk in chunks:
+                    if stop is not None and stop.is_set():
+                        break
+                    if chunk:
+                        buf.put(chunk)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                buf.put(done)
+
+        threading.Thread(target=feed, daemon=True).start()
+        t0 = time.perf_counter()
+        out = self.output(rate, channels)
+        pending = bytearray()
+        first = None
+        played = 0
+        finished = False
+        with out.lock:
+            while not finished:
+                if stop is not None and stop.is_set():
+                    break
+                try:
+                    # Short waits so a cancel is seen even while the source stalls.
+                    item = buf.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                if item is done:
+                    finished = True
+                else:
+                    pending += item
+                    if first is None and len(pending) < prebuffer:
+                        continue
+                # Keep whole sample frames; carry a split sample to the next write.
+                n = len(pending) if finished else len(pending) // frame * frame
+                if not n:
+                    continue
+                self._mark_audible(out, n, rate * frame)
+                try:
+                    if out.write(pending[:n], check_underflow=first is not None):
+                        self.stats["output_underruns"] += 1
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print("🔴 Playback Error:", e)
+                    break
+                if first is None:
+                    first = time.perf_counter() - t0
+                    self.stats["first_write_ms"] = first * 1000
+                    if on_audio:
+                        on_audio()
+                played += n
+                del pending[:n]
+        if cancel.is_cancelled(stop):
+            cancel.record(stop, "audio_seconds", len(pending) / (rate * frame))
+        elif errors:
+            self.stats["errors"] += 1
+            print("🔴 Stream Error:", errors[0])
+        self.stats["plays"] += 1
+        self.stats["played_seconds"] += played / (rate * frame)
+        return first
+
+    # Whether the speaker is (about to be) sounding audio we wrote: a write
+    # is audible for its own length plus the output latency.
+    def _mark_audible(self, out, nbytes, bytes_per_s):
+        until = time.perf_counter() + nbytes / bytes_per_s + out.latency
+        self.audible_until = max(self.audible_until, until)
+
+    def is_playing(self):
+        return time.perf_counter() < self.audible_until
+
+    def health(self):
+        with self._lock:
+            outputs = {f"{r}Hz/{c}ch": {"active": o.is_active(), "latency_ms": o.latency * 1000}
+                       for (r, c), o in self._outputs.items()}
+        return {**self.stats, "outputs": outputs}
+
+    def report(self):
+        s = self.stats
+        return (f"backend={s['backend']} init={s['init_ms']:.0f}ms "
+                f"outputs opened={s['outputs_opened']} reused={s['outputs_reused']} "
+                f"plays={s['plays']} played={s['played_seconds']:.1f}s "
+                f"underruns={s['output_underruns']} errors={s['errors']}")
+
+    def _close_output(self, out):
+        try:
+            out.close()
+        except Exception as e:
+            print("🔴 Close Error:", e)
+
+    def close(self):
+        with self._lock:
+            for out in self._outputs.values():
+                self._close_output(out)
+            self._outputs.clear()
+        self.backend.terminate()
+
+
+# === Process-wide manager ===
+_devices = None
+_devices_lock = threading.Lock()
+
+
+def get_devices():
+    global _devices
+    with _devices_lock:
+        if _devices is None:
+            _devices = AudioDevices()
+        return _devices
+
+
+def shutdown():
+    global _devices
+    with _devices_lock:
+        if _devices is not None:
+            print("🔈 Audio device stats:", _devices.report())
+            _devices.close()
+            _devices = None
@@ -0,0 +1,106 @@
+import time
+
+# Turn states carried by Status events.
+LISTENING = "listening"
+THINKING = "thinking"
+SPEAKING = "speaking"
+DONE = "done"
+NOT_HEARD = "not heard"
+STOPPED = "stopped"
+
+
+# === Pipeline events ===
+# What a turn reports to whoever is watching it: a console, a GUI, a server
+# connection or a benchmark. Events are plain immutable-by-convention
+# records stamped with the combo, the turn number and the time they were
+# emitted, so a consumer on another thread can order them and measure how
+# far behind it is. Nothing here knows about widgets.
+class Event:
+    __slots__ = ("combo", "turn", "t")
+
+    def __init__(self, combo, turn):
+        self.combo = combo
+        self.turn = turn
+        self.t = time.perf_counter()
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}(combo={self.combo!r}, turn={self.turn}, {fields})"
+
+
+class TurnStarted(Event):
+    __slots__ = ("label",)
+
+    def __init__(self, combo, turn, label):
+        super().__init__(combo, turn)
+        self.label = label
+
+
+class Status(Event):
+    __slots__ = ("state",)
+
+    def __init__(self, combo, turn, state):
+        super().__init__(combo, turn)
+        self.state = state
+
+
+# Interim STT hypothesis; each one replaces the previous.
+class Partial(Event):
+    __slots__ = ("text",)
+
+    def __init__(self, combo, turn, text):
+        super().__init__(combo, turn)
+        self.text = text
+
+
+class Transcript(Event):
+    __slots__ = ("text",)
+
+    def __init__(self, combo, turn, text):
+        super().__init__(combo, turn)
+        self.text = text
+
+
+# One LLM token delta; consumers append.
+class Delta(Event):
+    __slots__ = ("text",)
+
+    def __init__(self, combo, turn, text):
+        super().__init__(combo, turn)
+        self.text = text
+
+
+class Reply(Event):
+    __slots__ = ("text",)
+
+    def __init__(self, combo, turn, text):
+        super().__init__(combo, turn)
+        self.text = text
+
+
+# The user spoke over the reply; the turn continues with a new attempt.
+class BargeIn(Event):
+    __slots__ = ("after",)
+
+    def __init__(self, combo, turn, after):
+        super().__init__(combo, turn)
+        self.after = after
+
+
+class TurnFinished(Event):
+    __slots__ = ("transcript", "reply", "timings", "reason")
+
+    def __init__(self, combo, turn, transcript, reply, timings, reason=None):
+        super().__init__(combo, turn)
+        self.transcript = transcript
+        self.reply = reply
+        self.timings = timings
+        self.reason = reason        # cancel reason, None if the turn ran to the end
+
+
+class TurnFailed(Event):
+    __slots__ = ("error",)
+
+    def __init__(self, combo, turn, error):
+        super().__init__(combo, turn)
+        self.error = error
@@ -0,0 +1,261 @@
+import threading
+import time
+import tkinter as tk
+
+from . import events
+from .config import GUI_FPS
+
+STATUS_TEXT = {
+    events.LISTENING: "🎙 Listening...",
+    events.THINKING:  "🧠 Thinking...",
+    events.SPEAKING:  "🔊 Speaking...",
+    events.DONE:      "✅ Response spoken",
+    events.NOT_HEARD: "Could not understand.",
+    events.STOPPED:   "🛑 Stopped",
+}
+
+MIC_ICON = {
+    events.LISTENING: ("🎤", "green"),
+    events.THINKING:  ("⏳", "green"),
+    events.SPEAKING:  ("🔊", "green"),
+}
+
+
+# What one frame changes. None means "leave the widget alone".
+class Batch:
+    __slots__ = ("events", "reset", "input", "append", "reply", "status", "error", "busy",
+                 "oldest")
+
+    def __init__(self):
+        self.events = 0
+        self.reset = False
+        self.input = None
+        self.append = []
+        self.reply = None
+        self.status = None
+        self.error = None
+        self.busy = None
+        self.oldest = None
+
+
+# === GUI event coalescer ===
+# Sink between the runtime and Tk. Runtime threads only append to a list
+# under a lock, so rendering can never hold up STT, the LLM or playback.
+# Once per frame the Tk thread takes everything pending and folds it into
+# one Batch. A later partial or status replaces an earlier one. Deltas are
+# joined into a single insert. A new turn or barge-in discards whatever it
+# supersedes. Each widget is then touched at most once per frame, however
+# fast the events arrive.
+class EventCoalescer:
+    def __init__(self, combo_id=None):
+        self.combo_id = combo_id
+        self._pending = []
+        self._lock = threading.Lock()
+        self.stats = {"events": 0, "frames": 0, "batches": 0, "widget_updates": 0,
+                      "lag_ms_total": 0.0, "max_lag_ms": 0.0, "max_frame_ms": 0.0,
+                      "late_frames": 0}
+
+    def __call__(self, event):
+        if self.combo_id is None or event.combo == self.combo_id:
+            with self._lock:
+                self._pending.append(event)
+
+    def take(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        batch = Batch()
+        for event in pending:
+            batch.events += 1
+            if batch.oldest is None:
+                batch.oldest = event.t
+            if isinstance(event, (events.TurnStarted, events.BargeIn)):
+                batch.reset = True
+                batch.input = batch.reply = batch.error = None
+                batch.append.clear()
+                batch.busy = True
+            elif isinstance(event, events.Status):
+                batch.status = event.state
+            elif isinstance(event, (events.Partial, events.Transcript)):
+                batch.input = event.text
+            elif isinstance(event, events.Delta):
+                batch.append.append(event.text)
+            elif isinstance(event, events.Reply):
+                batch.reply = event.text
+                batch.append.clear()
+            elif isinstance(event, events.TurnFailed):
+                batch.error = event.error
+                batch.busy = False
+            elif isinstance(event, events.TurnFinished):
+                batch.busy = False
+        return batch
+
+    # Called by the view after it has rendered `batch`.
+    def record(self, batch, updates, t_start, late):
+        now = time.perf_counter()
+        s = self.stats
+        s["frames"] += 1
+        s["widget_updates"] += updates
+        s["max_frame_ms"] = max(s["max_frame_ms"], (now - t_start) * 1000)
+        if late:
+            s["late_frames"] += 1
+        if batch.events:
+            lag = (now - batch.oldest) * 1000
+            s["events"] += batch.events
+            s["batches"] += 1
+            s["lag_ms_total"] += lag
+            s["max_lag_ms"] = max(s["max_lag_ms"], lag)
+
+    def report(self):
+        s = self.stats
+        mean_lag = s["lag_ms_total"] / s["batches"] if s["batches"] else 0.0
+        return (f"events={s['events']} frames={s['frames']} batches={s['batches']} "
+                f"widget_updates={s['widget_updates']} max_lag={s['max_lag_ms']:.1f}ms "
+                f"mean_lag={mean_lag:.1f}ms max_frame={s['max_frame_ms']:.1f}ms "
+                f"late_frames={s['late_frames']}")
+
+
+# === Tk front-end ===
+# The combo window (same layout as the comboNN scripts) as a thin view over
+# a Runtime. Worker threads never touch a widget: the runtime's events land
+# in an EventCoalescer and are rendered here, on the Tk main thread, once
+# per frame from after(). Buttons only start or cancel turns.
+class VoiceApp:
+    def __init__(self, runtime, combo_id, fps=GUI_FPS):
+        self.runtime = runtime
+        self.combo = runtime.combo(combo_id)
+        self.frame_ms = max(1, round(1000 / fps))
+        self.coalescer = runtime.subscribe(EventCoalescer(self.combo.id))
+        self.dark_mode = False
+        self._build()
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self._due = time.perf_counter() + self.frame_ms / 1000
+        self.window.after(self.frame_ms, self._frame)
+
+    def _build(self):
+        self.window = window = tk.Tk()
+        window.title(f"🧠 Voice Assistant | {self.combo.label}")
+        window.geometry("960x640")
+        window.config(bg="#f2f2f2")
+
+        self.header = tk.Frame(window, bg="#007acc", height=60)
+        self.header.pack(fill="x")
+        tk.Label(self.header, text=f"Voice Assistant | {self.combo.label}",
+                 font=("Arial", 18, "bold"), bg="#007acc", fg="white").pack(pady=10)
+        self.theme_button = tk.Button(self.header, text="Toggle Theme", font=("Arial", 10),
+                                      bg="#7289da", fg="white", command=self.toggle_theme)
+        self.theme_button.pack(anchor="e", padx=10)
+
+        self.main_frame = tk.Frame(window, bg="white", padx=20, pady=10)
+        self.main_frame.pack(expand=True, fill="both")
+
+        tk.Label(self.main_frame, text="Speak your question:", font=("Arial", 12),
+                 bg="white").pack(anchor="w")
+        self.input_text = tk.Text(self.main_frame, height=4, font=("Arial", 11))
+        self.input_text.pack(fill="x", pady=5)
+
+        self.mic_icon = tk.Label(self.main_frame, text="", font=("Arial", 14), fg="green",
+                                 bg="white")
+        self.mic_icon.pack()
+
+        self.mic_button = tk.Button(self.main_frame, text="🎤 Tap to Speak",
+                                    font=("Arial", 13, "bold"), bg="#007acc", fg="white",
+                                    command=self.start)
+        self.mic_button.pack(pady=10)
+        self.stop_button = tk.Button(self.main_frame, text="🛑 Stop",
+                                     font=("Arial", 13, "bold"), bg="#007acc", fg="white",
+                                     command=self.stop)
+        self.stop_button.pack(pady=5)
+
+        tk.Label(self.main_frame, text="Assistant Response:", font=("Arial", 12, "bold"),
+                 bg="white").pack(anchor="w", pady=(10, 0))
+        self.chat_output = tk.Text(self.main_frame, height=10, font=("Arial", 11))
+        self.chat_output.pack(fill="both", expand=True, pady=5)
+
+        self.status = tk.StringVar(value="Ready")
+        tk.Label(window, textvariable=self.status, font=("Arial", 10), anchor="w", bd=1,
+                 relief="sunken", bg="#f2f2f2").pack(fill="x", side="bottom")
+
+    # --- commands (main thread) ----------------------------------------
+    # One turn at a time: the button stays disabled until the turn ends, so
+    # Stop always reaches the turn that is actually playing.
+    def start(self):
+        if self.runtime.busy(self.combo.id):
+            return
+        self.mic_button.config(state="disabled")
+        self.runtime.start_turn(self.combo.id)
+
+    def stop(self):
+        self.runtime.cancel(self.combo.id)
+
+    def toggle_theme(self):
+        self.dark_mode = dark = not self.dark_mode
+        bg      = "#2c2f33" if dark else "#f2f2f2"
+        panel   = "#23272a" if dark else "white"
+        text_bg = "#2c2f33" if dark else "white"
+        text_fg = "white"   if dark else "black"
+        accent  = "#7289da" if dark else "#007acc"
+
+        self.window.config(bg=bg)
+        self.header.config(bg=accent)
+        self.main_frame.config(bg=panel)
+        for button in (self.theme_button, self.mic_button, self.stop_button):
+            button.config(bg=accent, fg="white")
+        for w in self.main_frame.winfo_children():
+            w.config(bg=panel, fg=text_fg)
+        for text in (self.input_text, self.chat_output):
+            text.config(bg=text_bg, fg=text_fg, insertbackground=text_fg)
+
+    # --- runtime events -> widgets (one batch per frame) -----------------
+    def _frame(self):
+        t_start = time.perf_counter()
+        # A frame that starts more than one interval late means Tk itself
+        # is the bottleneck.
+        late = t_start - self._due > self.frame_ms / 1000
+        batch = self.coalescer.take()
+        updates = self._render(batch) if batch.events else 0
+        self.coalescer.record(batch, updates, t_start, late)
+        self._due = time.perf_counter() + self.frame_ms / 1000
+        self.window.after(self.frame_ms, self._frame)
+
+    def _render(self, batch):
+        updates = 0
+        if batch.reset:
+            self._replace(self.input_text, "")
+            self._replace(self.chat_output, "")
+            updates += 2
+        if batch.input is not None:
+            self._replace(self.input_text, batch.input)
+            updates += 1
+        if batch.reply is not None:
+            self._replace(self.chat_output, batch.reply)
+            updates += 1
+        elif batch.append:
+            self.chat_output.insert(tk.END, "".join(batch.append))
+            updates += 1
+        if batch.status is not None:
+            self.status.set(STATUS_TEXT.get(batch.status, batch.status))
+            icon, fg = MIC_ICON.get(batch.status, ("", "green"))
+            self.mic_icon.config(text=icon, fg=fg)
+            updates += 2
+        if batch.error is not None:
+            self.status.set(f"🔴 Error: {batch.error}")
+            self.mic_icon.config(text="")
+            updates += 2
+        if batch.busy is False and not self.runtime.busy(self.combo.id):
+            self.mic_button.config(state="normal")
+            updates += 1
+        return updates
+
+    @staticmethod
+    def _replace(widget, text):
+        widget.delete("1.0", tk.END)
+        widget.insert(tk.END, text)
+
+    def run(self):
+        self.window.mainloop()
+
+    def close(self):
+        self.runtime.unsubscribe(self.coalescer)
+        print("🖼 GUI render stats:", self.coalescer.report())
+        self.runtime.cancel(self.combo.id, reason="window closed")
+        self.window.destroy()
@@ -0,0 +1,269 @@
+import json
+
+import requests
+
+from . import cancel
+from .config import (OPENAI_API_KEY, GEMINI_API_KEY, COHERE_API_KEY,
+                     GROQ_API_KEY, SYSTEM_PROMPT)
+
+ERROR_REPLY = "Sorry, I couldn't generate a response."
+
+
+# === Server-sent events ===
+def sse_events(response):
+    response.encoding = "utf-8"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+
+# === Base adapter ===
+# Providers implement `_chat` (one blocking call) and `_stream` (yields text
+# deltas as they are generated), both taking OpenAI-style messages. `stop`
+# is the turn's cancel token; streaming providers close their response on
+# cancel so the generation stops instead of running to the end. Error
+# handling, conversation memory and the optional response caches (exact,
+# then semantic) live here so every provider behaves the same way. Only
+# complete, successful replies are cached and remembered.
+class LLM:
+    name = ""
+    default_model = ""
+    error_reply = ERROR_REPLY
+
+    def __init__(self, model=None):
+        self.model = model or self.default_model
+        self.cache = None
+        self.semantic = None
+        self.memory = None
+
+    def warm(self):
+        pass
+
+    def _messages(self, prompt, remember=True):
+        if remember and self.memory is not None:
+            return self.memory.messages_for(prompt)
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    def context(self, remember=True):
+        if remember and self.memory is not None:
+            return self.memory.digest()
+        return SYSTEM_PROMPT
+
+    def _cached(self, prompt, context):
+        if context is None:
+            return None
+        if self.cache is not None:
+            reply = self.cache.get(self.cache.key(self.name, self.model, prompt, context))
+            if reply:
+                return reply
+        if self.semantic is not None:
+            scope = self.semantic.scope(self.name, self.model, prompt, context)
+            return self.semantic.get(scope, prompt)
+        return None
+
+    def _store(self, prompt, reply, context):
+        if context is None:
+            return
+        if self.cache is not None:
+            self.cache.put(self.cache.key(self.name, self.model, prompt, context), reply)
+        if self.semantic is not None:
+            self.semantic.put(self.semantic.scope(self.name, self.model, prompt, context),
+                              prompt, reply)
+
+    def _remember(self, prompt, reply, remember):
+        if remember and self.memory is not None:
+            self.memory.add(prompt, reply)
+
+    def _chat(self, messages):
+        raise NotImplementedError
+
+    def _stream(self, messages, stop=None):
+        yield self._chat(messages)
+
+    # `remember=False` sends the prompt on its own and leaves memory untouched;
+    # `cache=False` neither reads nor writes the response caches.
+    def chat(self, prompt, remember=True, cache=True):
+        context = self.context(remember) if cache else None
+        reply = self._cached(prompt, context)
+        if not reply:
+            try:
+                reply = self._chat(self._messages(prompt, remember)).strip()
+            except Exception as e:
+                print(f"🔴 {self.name} Error:", e)
+                return self.error_reply
+            self._store(prompt, reply, context)
+        self._remember(prompt, reply, remember)
+        return reply
+
+    def stream(self, prompt, remember=True, stop=None):
+        context = self.context(remember)
+        reply = self._cached(prompt, context)
+        if reply:
+            yield reply
+            self._remember(prompt, reply, remember)
+            return
+        parts = []
+        try:
+            for delta in self._stream(self._messages(prompt, remember), stop):
+                if cancel.is_cancelled(stop):
+                    cancel.record(stop, "llm_streams")
+                    return
+                if delta:
+                    if not parts:
+                        delta = delta.lstrip()
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+        except Exception as e:
+            if cancel.is_cancelled(stop):
+                cancel.record(stop, "llm_streams")
+                return
+            print(f"🔴 {self.name} Stream Error:", e)
+            if not parts:
+                yield self.error_reply
+            return
+        reply = "".join(parts).strip()
+        self._store(prompt, reply, context)
+        self._remember(prompt, reply, remember)
+
+    def close(self):
+        session = getattr(self, "session", None)
+        if session is not None:
+            session.close()
+
+
+# === OpenAI ===
+class OpenAILLM(LLM):
+    name = "openai"
+    default_model = "gpt-4-1106-preview"
+
+    def warm(self):
+        import openai
+        openai.api_key = OPENAI_API_KEY
+        self.openai = openai
+
+    def _chat(self, messages):
+        response = self.openai.ChatCompletion.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7
+        )
+        return response.choices[0].message.content
+
+    def _stream(self, messages, stop=None):
+        for chunk in self.openai.ChatCompletion.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.7,
+                stream=True):
+            if chunk.choices:
+                yield chunk.choices[0].delta.get("content")
+
+
+# === Gemini (REST) ===
+class GeminiLLM(LLM):
+    name = "gemini"
+    default_model = "gemini-1.5-flash"
+    error_reply = "Sorry, Gemini API error."
+    base = "https://generativelanguage.googleapis.com/v1beta/models"
+
+    def warm(self):
+        self.session = requests.Session()
+        self.session.params = {"key": GEMINI_API_KEY}
+
+    @staticmethod
+    def _payload(messages):
+        system, *turns = messages
+        return {
+            "systemInstruction": {"parts": [{"text": system["content"]}]},
+            "contents": [{"role": "model" if m["role"] == "assistant" else "user",
+                          "parts": [{"text": m["content"]}]} for m in turns]
+        }
+
+    @staticmethod
+    def _text(data):
+        parts = data["candidates"][0].get("content", {}).get("parts", [])
+        return "".join(p.get("text", "") for p in parts)
+
+    def _chat(self, messages):
+        res = self.session.post(f"{self.base}/{self.model}:generateContent",
+                                json=self._payload(messages))
+        res.raise_for_status()
+        return self._text(res.json())
+
+    def _stream(self, messages, stop=None):
+        with self.session.post(f"{self.base}/{self.model}:streamGenerateContent",
+                               params={"alt": "sse"}, json=self._payload(messages),
+                               stream=True) as res, cancel.scope(stop, res.close):
+            res.raise_for_status()
+            for event in sse_events(res):
+                if event.get("candidates"):
+                    yield self._text(event)
+
+
+# === Cohere ===
+class CohereLLM(LLM):
+    name = "cohere"
+    default_model = "command-r"
+
+    def warm(self):
+        import cohere
+        self.co = cohere.Client(COHERE_API_KEY)
+
+    def _kwargs(self, messages):
+        system, *history, user = messages
+        return {
+            "model": self.model,
+            "message": user["content"],
+            "preamble": system["content"],
+            "chat_history": [{"role": "CHATBOT" if m["role"] == "assistant" else "USER",
+                              "message": m["content"]} for m in history]
+        }
+
+    def _chat(self, messages):
+        return self.co.chat(**self._kwargs(messages)).text
+
+    def _stream(self, messages, stop=None):
+        for event in self.co.chat_stream(**self._kwargs(messages)):
+            if event.event_type == "text-generation":
+                yield event.text
+
+
+# === Groq (OpenAI-compatible REST) ===
+class GroqLLM(LLM):
+    name = "groq"
+    default_model = "llama-3.1-8b-instant"
+    error_reply = "Sorry, an error occurred with Groq API."
+    url = "https://api.groq.com/openai/v1/chat/completions"
+
+    def warm(self):
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {GROQ_API_KEY}"
+
+    def _payload(self, messages, stream=False):
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": 4096,
+            "stream": stream
+        }
+
+    def _chat(self, messages):
+        response = self.session.post(self.url, json=self._payload(messages))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    def _stream(self, messages, stop=None):
+        with self.session.post(self.url, json=self._payload(messages, stream=True),
+                               stream=True) as response, cancel.scope(stop, response.close):
+            response.raise_for_status()
+            for event in sse_events(response):
+                if event.get("choices"):
+                    yield event["choices"][0].get("delta", {}).get("content")
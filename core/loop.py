@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# === Background event loop ===
+# One asyncio loop for the whole process, running on its own thread. GUI
+# and CLI threads hand it work through thread-safe futures, so turns never
+# build a loop per call and everything the providers keep open (sessions,
+# sockets, SDK clients) outlives the turn. Blocking adapter calls run on
+# the loop's default executor.
+class EventLoopThread:
+    def __init__(self, name="core-loop", workers=8):
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-io")
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True, name=name)
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "max_lag_ms": 0.0}
+
+    def start(self):
+        self.thread.start()
+        self.ready.wait()
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.set_default_executor(self.executor)
+        self.loop.call_soon(self.ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    async def _track(self, coro, t_submit):
+        lag = (time.perf_counter() - t_submit) * 1000
+        self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag)
+        try:
+            result = await coro
+        except BaseException:
+            self.stats["failed"] += 1
+            raise
+        self.stats["completed"] += 1
+        return result
+
+    # Schedules a coroutine from any thread; returns a concurrent Future.
+    def submit(self, coro):
+        self.stats["submitted"] += 1
+        return asyncio.run_coroutine_threadsafe(self._track(coro, time.perf_counter()),
+                                                self.loop)
+
+    # Runs a blocking callable on the loop's executor; returns a concurrent Future.
+    def call(self, fn, *args, **kwargs):
+        return self.submit(self.run_blocking(fn, *args, **kwargs))
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        return await self.loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+    def run(self, coro, timeout=None):
+        return self.submit(coro).result(timeout)
+
+    def report(self):
+        s = self.stats
+        return (f"submitted={s['submitted']} completed={s['completed']} "
+                f"failed={s['failed']} max_lag={s['max_lag_ms']:.1f}ms")
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2.0)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# === Process-wide loop ===
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = EventLoopThread().start()
+        return _loop
+
+
+def shutdown():
+    global _loop
+    with _loop_lock:
+        if _loop is not None:
+            print("🔁 Event loop stats:", _loop.report())
+            _loop.stop()
+            _loop = None
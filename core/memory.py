@@ -0,0 +1,167 @@
+import hashlib
+import re
+import threading
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from .config import SYSTEM_PROMPT, MEMORY_TOKEN_BUDGET, MEMORY_MAX_TURNS
+
+USER = "user"
+ASSISTANT = "assistant"
+
+# === Token counting ===
+# tiktoken when installed; otherwise ~1 token per word or punctuation mark,
+# which tracks BPE counts closely enough for budgeting English speech.
+if tiktoken is not None:
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text):
+        return len(_encoding.encode(text))
+else:
+    def count_tokens(text):
+        return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+class Message:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+        self.tokens = count_tokens(content) + 4   # role and framing overhead
+
+
+# === Conversation memory ===
+# Bounded history for one session. Token counts are computed once per
+# message and kept as a running total, so checking the budget is O(1).
+# When over budget the oldest messages are dropped; with a `summarize`
+# callable they are folded into a rolling summary instead.
+class ConversationMemory:
+    def __init__(self, budget=MEMORY_TOKEN_BUDGET, max_turns=MEMORY_MAX_TURNS,
+                 system_prompt=SYSTEM_PROMPT, summarize=None):
+        self.budget = budget
+        self.max_turns = max_turns
+        self.system = Message("system", system_prompt)
+        self.summarize = summarize
+        self.summary = None
+        self.messages = []
+        self.tokens = 0
+        self._lock = threading.Lock()
+        self.stats = {"turns": 0, "evicted": 0, "summaries": 0}
+
+    def add(self, prompt, reply):
+        with self._lock:
+            for msg in (Message(USER, prompt), Message(ASSISTANT, reply)):
+                self.messages.append(msg)
+                self.tokens += msg.tokens
+            self.stats["turns"] += 1
+            evicted = self._trim()
+        if evicted and self.summarize is not None:
+            # Off the reply path: the turn's speech must not wait on a summary.
+            threading.Thread(target=self._fold, args=(evicted,), daemon=True).start()
+
+    def _used(self):
+        used = self.system.tokens + self.tokens
+        return used + (self.summary.tokens if self.summary else 0)
+
+    # Drops whole turns (user + assistant) from the front.
+    def _trim(self):
+        evicted = []
+        while self.messages and (self._used() > self.budget
+                                 or len(self.messages) > 2 * self.max_turns):
+            for msg in self.messages[:2]:
+                self.tokens -= msg.tokens
+                evicted.append(msg)
+            del self.messages[:2]
+        self.stats["evicted"] += len(evicted)
+        return evicted
+
+    def _fold(self, evicted):
+        previous = self.summary.content if self.summary else ""
+        try:
+            text = self.summarize(previous, [(m.role, m.content) for m in evicted])
+        except Exception as e:
+            print("🔴 Summary Error:", e)
+            return
+        with self._lock:
+            self.summary = Message("system", f"Earlier in this conversation: {text}")
+            self.stats["summaries"] += 1
+            self._trim()
+
+    # Everything before the new user turn, oldest first.
+    def history(self):
+        with self._lock:
+            return [(m.role, m.content) for m in self.messages]
+
+    def system_prompt(self):
+        with self._lock:
+            if self.summary is None:
+                return self.system.content
+            return f"{self.system.content}\n\n{self.summary.content}"
+
+    def messages_for(self, prompt):
+        msgs = [{"role": "system", "content": self.system_prompt()}]
+        msgs += [{"role": role, "content": content} for role, content in self.history()]
+        msgs.append({"role": USER, "content": prompt})
+        return msgs
+
+    # Cache context: the whole conversation state. Whether a prompt leans on
+    # earlier turns can't be told from its words ("Why?", "Really?"), so a
+    # cached reply is only reused in an identical conversation.
+    def digest(self):
+        with self._lock:
+            h = hashlib.sha256(self.system.content.encode("utf-8"))
+            if self.summary is not None:
+                h.update(self.summary.content.encode("utf-8"))
+            for m in self.messages:
+                h.update(f"\x1f{m.role}\x1e{m.content}".encode("utf-8"))
+            return h.hexdigest()
+
+    def clear(self):
+        with self._lock:
+            self.messages.clear()
+            self.tokens = 0
+            self.summary = None
+
+    def report(self):
+        s = self.stats
+        return (f"turns={s['turns']} kept={len(self.messages) // 2} tokens={self._used()}"
+                f"/{self.budget} evicted={s['evicted']} summaries={s['summaries']}")
+
+
+# Summarizer built on any LLM adapter's `chat`, for rolling summaries.
+def llm_summarizer(adapter):
+    def summarize(previous, messages):
+        transcript = "\n".join(f"{role}: {content}" for role, content in messages)
+        prompt = ("Summarize this conversation in two sentences, keeping names, facts "
+                  f"and open questions.\n\nSummary so far: {previous or '(none)'}\n\n"
+                  f"{transcript}")
+        text = adapter.chat(prompt, remember=False, cache=False)
+        if text == adapter.error_reply:
+            raise RuntimeError(text)
+        return text
+    return summarize
+
+
+# === Sessions ===
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_memory(session="default", **kwargs):
+    with _sessions_lock:
+        memory = _sessions.get(session)
+        if memory is None:
+            memory = _sessions[session] = ConversationMemory(**kwargs)
+        return memory
+
+
+def reset(session=None):
+    with _sessions_lock:
+        if session is None:
+            _sessions.clear()
+        else:
+            _sessions.pop(session, None)
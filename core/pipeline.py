@@ -0,0 +1,227 @@
+import asyncio
+import threading
+import time
+
+from . import cancel, capture, devices, loop
+from .config import (PIPELINE_QUEUE_SIZE, PARTIAL_QUEUE_SIZE, SAMPLE_RATE, SAMPLE_WIDTH,
+                     CHANNELS, BARGE_IN)
+from .vad import VAD, BargeInDetector, SPEECH, END
+
+NOT_HEARD_REPLY = "Sorry, I didn't catch that."
+DONE = object()
+
+
+# === Overlapped turn pipeline ===
+# One turn as concurrent stages on the shared event loop:
+#
+#   capture ──▶ STT ──partials──▶ on_partial
+#                │
+#                └──transcript──▶ LLM ──deltas──▶ TTS ──segments──▶ playback
+#
+# Stages are joined by bounded queues: a full queue blocks the producer's
+# thread (backpressure) instead of buffering without limit, and the TTS
+# stage is further bounded by the speech pipeline's lookahead. A separate
+# capture reader runs its own VAD to timestamp the end of speech, so
+# end-of-speech -> first-audio is measured the same way for every STT.
+# `stop` is the turn's cancel token: adapters abort their own I/O on it, and
+# the pipeline stops waiting on any stage the moment it fires, so a cancel
+# returns within a bounded time even if a provider call cannot be aborted.
+# With `barge_in`, the mic stays live while the reply plays: user speech
+# cancels the turn ("barge-in") and marks where the next turn's audio
+# starts, so the interrupting words are already buffered.
+class TurnPipeline:
+    def __init__(self, combo, queue_size=PIPELINE_QUEUE_SIZE,
+                 partial_queue_size=PARTIAL_QUEUE_SIZE, barge_in=BARGE_IN):
+        self.combo = combo
+        self.queue_size = queue_size
+        self.partial_queue_size = partial_queue_size
+        self.barge_in = barge_in
+
+    # --- capture stage: end-of-speech timestamps -------------------------
+    @staticmethod
+    def _watch_speech(done, marks):
+        engine = capture.get_engine()
+        reader = engine.reader()
+        vad = VAD()
+        vad.prime(engine.before(reader.pos, vad.window_ms))
+        while not done.is_set():
+            data = reader.read(engine.chunk_bytes, timeout=0.2)
+            if data is None:
+                continue
+            state = vad.feed(data)
+            if state == SPEECH:
+                marks.setdefault("speech_start", time.perf_counter())
+            elif state == END:
+                # The speaker stopped when the trailing silence began.
+                marks["speech_end"] = time.perf_counter() - vad.silence_ms / 1000
+                vad.reset()
+
+    # --- barge-in: speech while the reply is playing -----------------------
+    @staticmethod
+    def _watch_barge_in(stop, done, marks):
+        engine = capture.get_engine()
+        output = devices.get_devices()
+        reader = engine.reader()
+        detector = BargeInDetector()
+        vad = detector.vad
+        vad.prime(engine.before(reader.pos, vad.window_ms))
+        frame = SAMPLE_WIDTH * CHANNELS
+        preroll = int(vad.preroll_ms / 1000 * SAMPLE_RATE) * frame
+        while not done.is_set() and not stop.is_set():
+            data = reader.read(engine.chunk_bytes, timeout=0.2)
+            if data is None or not detector.feed(data, output.is_playing()):
+                continue
+            spoken = int(vad.speech_ms / 1000 * SAMPLE_RATE) * frame
+            engine.resume_from(max(engine.ring.oldest(), reader.pos - spoken - preroll))
+            marks["barge_in"] = time.perf_counter()
+            stop.cancel("barge-in")
+            return
+
+    # --- thread -> loop bridges -------------------------------------------
+    @staticmethod
+    def _put_blocking(aloop, q, item):
+        asyncio.run_coroutine_threadsafe(q.put(item), aloop).result()
+
+    @staticmethod
+    def _put_latest(q, item):
+        # Partials supersede each other: drop the oldest rather than block STT.
+        if q.full():
+            q.get_nowait()
+        q.put_nowait(item)
+
+    # Awaits `aw` unless `stop` fires first. A blocking call is abandoned
+    # (left to finish on its thread, result dropped); anything else is
+    # cancelled outright.
+    @staticmethod
+    async def _unless_cancelled(stop, aw, blocking=True):
+        fut = asyncio.ensure_future(aw)
+        if not isinstance(stop, cancel.CancelToken):
+            return await fut
+        aloop = asyncio.get_running_loop()
+        fired = aloop.create_future()
+        handle = stop.on_cancel(
+            lambda: aloop.call_soon_threadsafe(lambda: fired.done() or fired.set_result(None)))
+        try:
+            await asyncio.wait({fut, fired}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if handle is not None:
+                stop.remove(handle)
+        if fut.done():
+            return fut.result()
+        if blocking:
+            cancel.record(stop, "abandoned_calls")
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        else:
+            fut.cancel()
+        return None
+
+    async def _drain_partials(self, partials, on_partial):
+        while True:
+            text = await partials.get()
+            if text is DONE:
+                return
+            if on_partial:
+                on_partial(text)
+
+    # --- LLM stage ---------------------------------------------------------
+    def _generate(self, aloop, transcript, deltas, stop, marks):
+        stream = self.combo.llm.stream(transcript, stop=stop)
+        try:
+            for delta in stream:
+                marks.setdefault("first_token", time.perf_counter())
+                self._put_blocking(aloop, deltas, delta)
+                if stop is not None and stop.is_set():
+                    break
+        finally:
+            stream.close()
+            marks["llm_done"] = time.perf_counter()
+            self._put_blocking(aloop, deltas, DONE)
+
+    async def run(self, stop=None, on_transcript=None, on_reply=None, on_delta=None,
+                  on_partial=None):
+        runner = loop.get_loop()
+        aloop = asyncio.get_running_loop()
+        timings = {}
+        marks = {}
+        t0 = time.perf_counter()
+
+        listening = threading.Event()
+        watcher = asyncio.ensure_future(runner.run_blocking(self._watch_speech, listening, marks))
+        partials = asyncio.Queue(self.partial_queue_size)
+        drain = asyncio.ensure_future(self._drain_partials(partials, on_partial))
+        try:
+            transcript = await self._unless_cancelled(stop, runner.run_blocking(
+                self.combo.stt.listen, stop,
+                lambda text: aloop.call_soon_threadsafe(self._put_latest, partials, text)))
+        finally:
+            capture.get_engine().clear_resume()
+            listening.set()
+            aloop.call_soon_threadsafe(self._put_latest, partials, DONE)
+        t_heard = time.perf_counter()
+        timings["stt"] = t_heard - t0
+        await asyncio.gather(watcher, drain)
+        if stop is not None and stop.is_set():
+            return None, None, timings
+        if not transcript:
+            await runner.run_blocking(self.combo.speech.speak, NOT_HEARD_REPLY, stop)
+            return None, None, timings
+        if on_transcript:
+            on_transcript(transcript)
+        speech_end = marks.get("speech_end", t_heard)
+        timings["stt_final"] = t_heard - speech_end
+
+        responding = threading.Event()
+        if self.barge_in and isinstance(stop, cancel.CancelToken):
+            barge = asyncio.ensure_future(
+                runner.run_blocking(self._watch_barge_in, stop, responding, marks))
+        else:
+            barge = None
+        try:
+            reply = await self._respond(stop, transcript, t_heard, timings, marks, on_delta,
+                                        on_reply)
+        finally:
+            responding.set()
+        if barge is not None:
+            await barge
+        if "barge_in" in marks:
+            timings["barge_in"] = marks["barge_in"] - t_heard
+        if "first_audio" in timings:
+            timings["eos_to_first_audio"] = timings.pop("first_audio_at") - speech_end
+        timings["total"] = time.perf_counter() - t0
+        if stop is not None and stop.is_set():
+            return transcript, reply or None, timings
+        return transcript, reply, timings
+
+    async def _respond(self, stop, transcript, t_heard, timings, marks, on_delta, on_reply):
+        runner = loop.get_loop()
+        aloop = asyncio.get_running_loop()
+        deltas = asyncio.Queue(self.queue_size)
+        speech = self.combo.speech.stream(stop)
+        producer = asyncio.ensure_future(
+            runner.run_blocking(self._generate, aloop, transcript, deltas, stop, marks))
+        parts = []
+        while True:
+            delta = await self._unless_cancelled(stop, deltas.get(), blocking=False)
+            if delta is DONE or delta is None:
+                break
+            parts.append(delta)
+            if on_delta:
+                on_delta(delta)
+            # May block while `lookahead` segments are already rendering.
+            await runner.run_blocking(speech.feed, delta)
+        await self._unless_cancelled(stop, producer)
+        reply = "".join(parts).strip()
+        if "first_token" in marks:
+            timings["llm_first_token"] = marks["first_token"] - t_heard
+        timings["llm"] = marks.get("llm_done", time.perf_counter()) - t_heard
+        if on_reply and reply:
+            on_reply(reply)
+
+        t_flush = time.perf_counter()
+        first_audio = await runner.run_blocking(speech.finish)
+        if first_audio is not None:
+            timings["first_audio"] = first_audio
+            timings["first_audio_at"] = speech.t0 + first_audio
+        timings["tts"] = time.perf_counter() - t_flush
+        return reply
+
@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+
+from . import stt, llm, tts, cache, cancel, capture, devices, loop, memory
+from .config import MEMORY_SUMMARIZE
+from .pipeline import TurnPipeline, NOT_HEARD_REPLY
+from .speech import SpeechPipeline
+
+# === Providers ===
+STT_PROVIDERS = {
+    "azure":           stt.AzureSTT,
+    "deepgram":        stt.DeepgramSTT,
+    "deepgram_live":   stt.DeepgramLiveSTT,
+    "assemblyai":      stt.AssemblyAISTT,
+    "assemblyai_live": stt.AssemblyAIStreamingSTT,
+    "whisper":         stt.WhisperSTT,
+    "sr":              stt.SpeechRecognitionSTT,
+}
+
+LLM_PROVIDERS = {
+    "openai": llm.OpenAILLM,
+    "gemini": llm.GeminiLLM,
+    "cohere": llm.CohereLLM,
+    "groq":   llm.GroqLLM,
+}
+
+TTS_PROVIDERS = {
+    "azure":    tts.AzureTTS,
+    "deepgram": tts.DeepgramTTS,
+    "pyttsx3":  tts.Pyttsx3TTS,
+    "none":     tts.NullTTS,
+}
+
+# Fixed replies spoken without an LLM; pre-rendered into the TTS cache.
+FIXED_PHRASES = [NOT_HEARD_REPLY, llm.ERROR_REPLY,
+                 *sorted({p.error_reply for p in LLM_PROVIDERS.values()} - {llm.ERROR_REPLY})]
+
+# === Combos (folder id -> STT, LLM[:model], TTS) ===
+COMBOS = {
+    "11":     ("azure",           "gemini",                    "azure"),
+    "12":     ("deepgram_live",   "openai:gpt-4o",             "azure"),
+    "14":     ("azure",           "groq",                      "azure"),
+    "21":     ("deepgram_live",   "gemini",                    "azure"),
+    "22":     ("deepgram_live",   "openai:gpt-3.5-turbo",      "azure"),
+    "26":     ("deepgram_live",   "cohere:command-r",          "azure"),
+    "41":     ("assemblyai_live", "gemini",                    "azure"),
+    "42":     ("assemblyai_live", "openai:gpt-4-1106-preview", "azure"),
+    "46":     ("assemblyai_live", "cohere:command-r",          "azure"),
+    "51":     ("whisper",         "openai:gpt-4-1106-preview", "azure"),
+    "52":     ("whisper",         "gemini",                    "azure"),
+    "56":     ("whisper",         "cohere:command-r",          "azure"),
+    "531":    ("deepgram_live",   "openai:gpt-3.5-turbo",      "azure"),
+    "532":    ("azure",           "gemini",                    "deepgram"),
+    "536":    ("azure",           "cohere:command-r",          "azure"),
+    "541":    ("deepgram_live",   "gemini",                    "deepgram"),
+    "542":    ("deepgram_live",   "openai:gpt-4-1106-preview", "deepgram"),
+    "546":    ("deepgram_live",   "cohere:command-r",          "none"),
+    "561":    ("assemblyai",      "gemini",                    "deepgram"),
+    "562":    ("assemblyai",      "openai:gpt-4-1106-preview", "deepgram"),
+    "566":    ("assemblyai",      "cohere:command-r-plus",     "deepgram"),
+    "571":    ("whisper",         "gemini",                    "deepgram"),
+    "572":    ("whisper",         "openai:gpt-4-1106-preview", "deepgram"),
+    "576":    ("sr",              "cohere:command-r-plus",     "deepgram"),
+    "601":    ("sr",              "openai:gpt-4-1106-preview", "deepgram"),
+    "602":    ("sr",              "gemini",                    "deepgram"),
+    "606":    ("sr",              "cohere:command-r-plus",     "deepgram"),
+    "81":     ("sr",              "gemini",                    "azure"),
+    "82":     ("sr",              "openai:gpt-4o",             "azure"),
+    "86":     ("sr",              "cohere:command-r",          "azure"),
+    "921":    ("azure",           "gemini",                    "pyttsx3"),
+    "922":    ("azure",           "openai:gpt-4-1106-preview", "pyttsx3"),
+    "926":    ("azure",           "cohere:command-r-plus",     "pyttsx3"),
+    "931":    ("deepgram_live",   "gemini",                    "pyttsx3"),
+    "932":    ("deepgram_live",   "openai:gpt-4-1106-preview", "pyttsx3"),
+    "936":    ("deepgram_live",   "cohere:command-r-plus",     "pyttsx3"),
+    "951":    ("assemblyai",      "gemini",                    "pyttsx3"),
+    "952":    ("assemblyai",      "openai:gpt-4-1106-preview", "pyttsx3"),
+    "956":    ("assemblyai",      "cohere:command-r-plus",     "pyttsx3"),
+    "961":    ("whisper",         "gemini",                    "pyttsx3"),
+    "962":    ("whisper",         "openai:gpt-4-1106-preview", "pyttsx3"),
+    "966":    ("whisper",         "cohere:command-r-plus",     "pyttsx3"),
+    "991":    ("sr",              "gemini",                    "pyttsx3"),
+    "992":    ("sr",              "openai:gpt-4o",             "pyttsx3"),
+    "simple": ("azure",           "cohere:command-r",          "azure"),
+    "time":   ("deepgram_live",   "cohere:command-r",          "azure"),
+}
+
+# === Warm client cache ===
+# One adapter per spec for the whole process, so switching combos reuses
+# clients (HTTP sessions, SDK objects, audio devices) that are already up.
+_instances = {}
+_lock = threading.Lock()
+
+
+def _split(spec):
+    name, _, option = spec.partition(":")
+    return name, option or None
+
+
+def _get(kind, providers, spec):
+    key = (kind, spec)
+    with _lock:
+        adapter = _instances.get(key)
+        if adapter is None:
+            name, option = _split(spec)
+            if name not in providers:
+                raise KeyError(f"Unknown {kind} provider: {name}")
+            adapter = providers[name](option) if option else providers[name]()
+            t0 = time.perf_counter()
+            adapter.warm()
+            print(f"🔥 Warmed {kind} {spec} in {time.perf_counter() - t0:.2f}s")
+            _instances[key] = adapter
+    return adapter
+
+
+def get_stt(spec):
+    return _get("stt", STT_PROVIDERS, spec)
+
+
+def get_llm(spec):
+    adapter = _get("llm", LLM_PROVIDERS, spec)
+    adapter.cache = cache.get_response_cache()
+    adapter.semantic = cache.get_semantic_cache()
+    # One conversation shared by every adapter, so switching combos mid-session
+    # keeps the thread; the first adapter doubles as the summarizer.
+    adapter.memory = memory.get_memory(
+        summarize=memory.llm_summarizer(adapter) if MEMORY_SUMMARIZE else None)
+    return adapter
+
+
+def get_tts(spec):
+    return _get("tts", TTS_PROVIDERS, spec)
+
+
+def get_speech(spec):
+    key = ("speech", spec)
+    tts_adapter = get_tts(spec)
+    with _lock:
+        pipeline = _instances.get(key)
+        if pipeline is None:
+            pipeline = _instances[key] = SpeechPipeline(tts_adapter,
+                                                        cache=cache.get_tts_cache())
+            pipeline.prerender(FIXED_PHRASES)
+    return pipeline
+
+
+def warm_all(combo_ids=None):
+    for combo_id in combo_ids or COMBOS:
+        build_combo(combo_id)
+
+
+def close_all():
+    with _lock:
+        for adapter in _instances.values():
+            try:
+                adapter.close()
+            except Exception as e:
+                print("🔴 Close Error:", e)
+        _instances.clear()
+    loop.shutdown()
+    print("⛔ Cancellation savings:", cancel.report())
+    memory.reset()
+    cache.shutdown()
+    capture.shutdown()
+    devices.shutdown()
+
+
+# === Combo ===
+class Combo:
+    def __init__(self, combo_id, stt_spec, llm_spec, tts_spec):
+        self.id  = combo_id
+        self.stt = get_stt(stt_spec)
+        self.llm = get_llm(llm_spec)
+        self.tts = get_tts(tts_spec)
+        self.speech = get_speech(tts_spec)
+        self.label = f"{stt_spec} + {llm_spec} + {tts_spec}"
+        self.pipeline = TurnPipeline(self)
+        self.current = None
+        self._turn_lock = None
+
+    # Runs a turn on the shared event loop; safe to call from any thread
+    # (e.g. a GUI button). Turns of one combo never overlap. Returns a
+    # concurrent Future resolving to run_turn's (transcript, reply, timings);
+    # its `token` cancels the turn, as does cancelling the future.
+    def submit_turn(self, stop=None, **kwargs):
+        token = stop if stop is not None else cancel.CancelToken()
+        future = loop.get_loop().submit(self.turn(stop=token, **kwargs))
+        future.token = token
+        future.add_done_callback(lambda f: f.cancelled() and token.cancel("future cancelled"))
+        return future
+
+    # Cancels the turn in progress, e.g. from a Stop button.
+    def cancel(self, reason="stop"):
+        if self.current is not None:
+            self.current.cancel(reason)
+
+    # A barge-in cancels only the attempt's child token: the interrupted reply
+    # is dropped and the next turn starts at once from the interrupting
+    # speech, which capture has already buffered.
+    async def turn(self, stop=None, on_barge_in=None, **kwargs):
+        outer = stop if stop is not None else cancel.CancelToken()
+        if self._turn_lock is None:
+            self._turn_lock = asyncio.Lock()
+        async with self._turn_lock:
+            while True:
+                stop = outer.child() if isinstance(outer, cancel.CancelToken) else outer
+                self.current = stop
+                try:
+                    transcript, reply, timings = await self.pipeline.run(stop, **kwargs)
+                finally:
+                    self.current = None
+                self._report(stop, reply, timings)
+                if getattr(stop, "reason", None) != "barge-in" or outer.is_set():
+                    return transcript, reply, timings
+                print(f"🗣 [{self.id}] barge-in after {timings.get('barge_in', 0):.2f}s, "
+                      "listening")
+                if on_barge_in:
+                    on_barge_in(timings.get("barge_in", 0.0))
+
+    def _report(self, stop, reply, timings):
+        if getattr(stop, "cancelled_at", None) is not None:
+            timings["cancel"] = time.perf_counter() - stop.cancelled_at
+            saved = ", ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+                              for k, v in stop.saved.items())
+            print(f"⛔ [{self.id}] {stop.reason}: stopped in {timings['cancel']:.2f}s"
+                  + (f", saved {saved}" if saved else ""))
+        elif reply is not None and not stop.is_set():
+            print(f"⏱ [{self.id}] " + ", ".join(f"{k}: {v:.2f}s" for k, v in timings.items()))
+
+    # Blocking convenience wrapper for callers outside the event loop.
+    def run_turn(self, **kwargs):
+        return loop.get_loop().run(self.turn(**kwargs))
+
+
+def build_combo(combo_id=None, stt_spec=None, llm_spec=None, tts_spec=None):
+    if combo_id is not None:
+        stt_spec, llm_spec, tts_spec = COMBOS[str(combo_id)]
+    else:
+        combo_id = f"{stt_spec}/{llm_spec}/{tts_spec}"
+    return Combo(combo_id, stt_spec, llm_spec, tts_spec)
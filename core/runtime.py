@@ -0,0 +1,166 @@
+import itertools
+import queue
+import threading
+
+from . import events
+from .registry import build_combo, close_all
+
+
+# === Headless runtime ===
+# Runs turns for any number of combos and reports them as typed events
+# (see events.py) to subscribed sinks. It never touches a widget: a console,
+# a GUI, a server connection or a benchmark harness is just another sink,
+# so a combo runs the same with or without a display. Sinks are called on
+# the event-loop thread and must not block; front-ends with their own
+# thread subscribe a sink that only buffers (QueueSink, gui.EventCoalescer)
+# and drain it themselves.
+class Runtime:
+    def __init__(self):
+        self.combos = {}
+        self.sinks = []
+        self.running = {}
+        self._turns = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, sink):
+        with self._lock:
+            self.sinks.append(sink)
+        return sink
+
+    def unsubscribe(self, sink):
+        with self._lock:
+            if sink in self.sinks:
+                self.sinks.remove(sink)
+
+    def emit(self, event):
+        for sink in list(self.sinks):
+            try:
+                sink(event)
+            except Exception as e:
+                print("🔴 Sink Error:", e)
+
+    def combo(self, combo_id):
+        combo_id = str(combo_id)
+        with self._lock:
+            combo = self.combos.get(combo_id)
+            if combo is None:
+                combo = self.combos[combo_id] = build_combo(combo_id)
+            return combo
+
+    # Starts a turn on the shared loop and returns its concurrent Future,
+    # which resolves to (transcript, reply, timings). Safe from any thread.
+    def start_turn(self, combo_id, stop=None):
+        combo = self.combo(combo_id)
+        turn = next(self._turns)
+        state = {"replying": False}
+
+        def status(name):
+            self.emit(events.Status(combo.id, turn, name))
+
+        def on_partial(text):
+            self.emit(events.Partial(combo.id, turn, text))
+
+        def on_transcript(text):
+            self.emit(events.Transcript(combo.id, turn, text))
+            status(events.THINKING)
+
+        def on_delta(text):
+            if not state["replying"]:
+                state["replying"] = True
+                status(events.SPEAKING)
+            self.emit(events.Delta(combo.id, turn, text))
+
+        def on_reply(text):
+            self.emit(events.Reply(combo.id, turn, text))
+
+        def on_barge_in(after):
+            state["replying"] = False
+            self.emit(events.BargeIn(combo.id, turn, after))
+            status(events.LISTENING)
+
+        self.emit(events.TurnStarted(combo.id, turn, combo.label))
+        status(events.LISTENING)
+        future = combo.submit_turn(stop, on_partial=on_partial, on_transcript=on_transcript,
+                                   on_delta=on_delta, on_reply=on_reply,
+                                   on_barge_in=on_barge_in)
+        with self._lock:
+            self.running.setdefault(combo.id, set()).add(future)
+        future.add_done_callback(lambda f: self._finished(combo.id, turn, f))
+        return future
+
+    def _finished(self, combo_id, turn, future):
+        with self._lock:
+            futures = self.running.get(combo_id, set())
+            futures.discard(future)
+            if not futures:
+                self.running.pop(combo_id, None)
+        token = future.token
+        if future.cancelled():
+            self.emit(events.TurnFinished(combo_id, turn, None, None, {}, token.reason))
+            self.emit(events.Status(combo_id, turn, events.STOPPED))
+            return
+        error = future.exception()
+        if error is not None:
+            self.emit(events.TurnFailed(combo_id, turn, error))
+            return
+        transcript, reply, timings = future.result()
+        reason = token.reason if token.is_set() else None
+        self.emit(events.TurnFinished(combo_id, turn, transcript, reply, timings, reason))
+        if reason is not None:
+            state = events.STOPPED
+        elif transcript is None:
+            state = events.NOT_HEARD
+        else:
+            state = events.DONE
+        self.emit(events.Status(combo_id, turn, state))
+
+    def run_turn(self, combo_id, stop=None):
+        return self.start_turn(combo_id, stop).result()
+
+    def busy(self, combo_id):
+        with self._lock:
+            return bool(self.running.get(str(combo_id)))
+
+    # Cancels every outstanding turn of one combo, or of every combo: the
+    # one playing and any queued behind it on the combo's turn lock.
+    def cancel(self, combo_id=None, reason="stop"):
+        with self._lock:
+            targets = [(self.combos[cid], list(futures)) for cid, futures in self.running.items()
+                       if combo_id is None or cid == str(combo_id)]
+        for combo, futures in targets:
+            for future in futures:
+                future.token.cancel(reason)
+            combo.cancel(reason)
+
+    def close(self):
+        self.cancel(reason="shutdown")
+        close_all()
+
+
+# === Sinks ===
+# Hands events to a consumer on another thread; drain() never blocks.
+class QueueSink:
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+
+    def __call__(self, event):
+        self.queue.put(event)
+
+    def drain(self, limit=None):
+        items = []
+        while limit is None or len(items) < limit:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+
+# Prints finished transcripts and replies, as the CLI always has.
+def console_sink(event):
+    if isinstance(event, events.Transcript):
+        print("📝 Transcript:", event.text)
+    elif isinstance(event, events.Reply):
+        print("🤖 Reply:", event.text)
+    elif isinstance(event, events.TurnFailed):
+        print(f"🔴 [{event.combo}] Turn Error:", event.error)
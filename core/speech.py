@@ -0,0 +1,271 @@
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import cancel
+from .config import TTS_LOOKAHEAD, TTS_FIRST_MAX_CHARS, TTS_MAX_CHARS, TTS_MIN_CHARS
+
+# === Text segmentation ===
+SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+")
+CLAUSE_END   = re.compile(r"(?<=[,;:—–])\s+")
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "vs", "etc", "e.g", "i.e", "jr", "sr", "no"}
+
+
+def _is_abbreviation(text, end):
+    word = text[:end].rstrip(".\"')] \n").rsplit(None, 1)[-1:]
+    return bool(word) and word[0].lower() in ABBREVIATIONS
+
+
+def _boundaries(text, pattern):
+    for m in pattern.finditer(text):
+        if pattern is SENTENCE_END and _is_abbreviation(text, m.start()):
+            continue
+        yield m.start(), m.end()
+
+
+def _split_long(segment, limit):
+    # Break an over-long sentence at clause punctuation, then at spaces.
+    parts = []
+    while len(segment) > limit:
+        cut = None
+        for start, end in _boundaries(segment, CLAUSE_END):
+            if start > limit:
+                break
+            if start >= TTS_MIN_CHARS:
+                cut = (start, end)
+        if cut is None:
+            space = segment.rfind(" ", TTS_MIN_CHARS, limit)
+            if space < 0:
+                break
+            cut = (space, space + 1)
+        parts.append(segment[:cut[0]].strip())
+        segment = segment[cut[1]:]
+    parts.append(segment.strip())
+    return [p for p in parts if p]
+
+
+class Segmenter:
+    # Incremental splitter: feed text deltas, get back speakable segments as
+    # soon as a boundary is seen. The first segment is kept short so the
+    # first synthesis request returns quickly.
+    def __init__(self):
+        self.buffer = ""
+        self.emitted = 0
+
+    def _take(self, segment):
+        if self.emitted == 0 and len(segment) > TTS_FIRST_MAX_CHARS:
+            head, *rest = _split_long(segment, TTS_FIRST_MAX_CHARS)
+            parts = [head] + _split_long(" ".join(rest), TTS_MAX_CHARS)
+        else:
+            parts = _split_long(segment, TTS_MAX_CHARS)
+        parts = [p for p in parts if p]
+        self.emitted += len(parts)
+        return parts
+
+    def feed(self, delta):
+        self.buffer += delta
+        out = []
+        while True:
+            cut = None
+            for start, end in _boundaries(self.buffer, SENTENCE_END):
+                if start >= TTS_MIN_CHARS:
+                    cut = (start, end)
+                    break
+            if cut is None and self.emitted == 0 and len(self.buffer) > TTS_FIRST_MAX_CHARS:
+                for start, end in _boundaries(self.buffer, CLAUSE_END):
+                    if start >= TTS_MIN_CHARS:
+                        cut = (start, end)
+                        break
+            if cut is None:
+                break
+            out.extend(self._take(self.buffer[:cut[0]]))
+            self.buffer = self.buffer[cut[1]:]
+        return out
+
+    def flush(self):
+        rest, self.buffer = self.buffer.strip(), ""
+        return self._take(rest) if rest else []
+
+
+def split_sentences(text):
+    seg = Segmenter()
+    return seg.feed(text) + seg.flush()
+
+
+# === Sentence-pipelined speech ===
+# Synthesis of segment N+1.. runs on a small pool while segment N plays.
+# At most `lookahead` segments are rendered-but-unplayed at any time, and
+# playback always follows text order. With a cache, hits are resolved
+# inline and never take a synthesis slot. A segment with nothing ahead of
+# it (the head, or one arriving after the player has caught up) is
+# streamed through `speak` on backends that can, so it starts playing on
+# the first bytes instead of after the whole render.
+STREAM = object()
+
+class SpeechPipeline:
+    def __init__(self, tts, lookahead=TTS_LOOKAHEAD, cache=None):
+        self.tts = tts
+        self.lookahead = lookahead
+        self.cache = cache
+        self.pool = ThreadPoolExecutor(max_workers=lookahead,
+                                       thread_name_prefix=f"tts-{tts.name}")
+
+    def stream(self, stop=None):
+        return SpeechStream(self, stop)
+
+    def speak(self, text, stop=None):
+        s = self.stream(stop)
+        s.feed(text)
+        return s.finish()
+
+    def cached(self, text):
+        if self.cache is None or not self.tts.can_synthesize:
+            return None, None
+        key = self.cache.key(self.tts, text)
+        return key, self.cache.get(key)
+
+    def synthesize(self, text, key=None, stop=None):
+        clip = self.tts.synthesize(text, stop)
+        if key is not None:
+            self.cache.put(key, clip)
+        return clip
+
+    # Renders fixed phrases into the cache in the background.
+    def prerender(self, phrases):
+        if self.cache is None or not self.tts.can_synthesize:
+            return []
+        return [self.pool.submit(self.cache.synthesize, self.tts, p) for p in phrases]
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+class SpeechStream:
+    def __init__(self, pipeline, stop=None):
+        self.tts = pipeline.tts
+        self.pool = pipeline.pool
+        self.pipeline = pipeline
+        self.stop = stop
+        self.segmenter = Segmenter()
+        self.slots = threading.BoundedSemaphore(pipeline.lookahead)
+        self.jobs = []
+        self.played = 0
+        self.cond = threading.Condition()
+        self.closed = False
+        self.t0 = time.perf_counter()
+        self.first_audio = None
+        self.player = threading.Thread(target=self._play_loop, daemon=True)
+        self.player.start()
+        self._hook = stop.on_cancel(self._abort) if isinstance(stop, cancel.CancelToken) else None
+
+    # Runs on cancel: drop renders that have not started; the play loop then
+    # skips what is left. Renders and streams already running watch this
+    # turn's token themselves. Only a queueing engine needs its shared
+    # output cut, since the utterances it holds are this turn's.
+    def _abort(self):
+        with self.cond:
+            for _, job, _, _ in self.jobs:
+                if isinstance(job, Future):
+                    job.cancel()
+            self.cond.notify()
+        if self.tts.can_queue:
+            self.tts.stop()
+
+    def _stopped(self):
+        return self.stop is not None and self.stop.is_set()
+
+    def _submit(self, segment):
+        if self._stopped():
+            cancel.record(self.stop, "tts_segments")
+            return
+        slot = False
+        key, clip = self.pipeline.cached(segment)
+        with self.cond:
+            idle = self.played == len(self.jobs)
+        if clip is not None:
+            job = Future()
+            job.set_result(clip)
+        elif self.tts.can_stream and idle:
+            job = STREAM
+        elif self.tts.can_synthesize:
+            # Blocks the producer when `lookahead` segments are already pending.
+            self.slots.acquire()
+            slot = True
+            job = self.pool.submit(self.pipeline.synthesize, segment, key, self.stop)
+        elif self.tts.can_queue:
+            # The engine keeps its own utterance queue; hand the segment over
+            # now so segments play back to back.
+            job = self.tts.say(segment)
+        else:
+            job = None
+        with self.cond:
+            self.jobs.append((segment, job, slot, key))
+            self.cond.notify()
+
+    def feed(self, delta):
+        for segment in self.segmenter.feed(delta):
+            self._submit(segment)
+
+    def finish(self):
+        for segment in self.segmenter.flush():
+            self._submit(segment)
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.player.join()
+        if self._hook is not None:
+            self.stop.remove(self._hook)
+        return self.first_audio
+
+    def _play_loop(self):
+        index = 0
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: index < len(self.jobs) or self.closed)
+                if index >= len(self.jobs):
+                    return
+                segment, job, slot, key = self.jobs[index]
+            index += 1
+            try:
+                if self._stopped():
+                    cancel.record(self.stop, "tts_segments")
+                    continue
+                if job is STREAM:
+                    clip = self.tts.speak(segment, self.stop, on_audio=self._mark_first_audio)
+                    if clip is not None and key is not None:
+                        self.pipeline.cache.put(key, clip)
+                    continue
+                if job is None or isinstance(job, threading.Event):
+                    if self.first_audio is None:
+                        self.first_audio = time.perf_counter() - self.t0
+                    if job is None:
+                        self.tts.speak(segment, self.stop)
+                    else:
+                        self._wait_spoken(job)
+                    continue
+                clip = job.result()
+                if self.first_audio is None:
+                    self.first_audio = time.perf_counter() - self.t0
+                    print(f"🔊 TTS first audio: {self.first_audio:.2f}s")
+                self.tts.play(clip, self.stop)
+            except Exception as e:
+                if self._stopped():
+                    cancel.record(self.stop, "tts_segments")
+                else:
+                    print("🔴 TTS Segment Error:", e)
+            finally:
+                if slot:
+                    self.slots.release()
+                with self.cond:
+                    self.played += 1
+
+    def _mark_first_audio(self):
+        if self.first_audio is None:
+            self.first_audio = time.perf_counter() - self.t0
+
+    def _wait_spoken(self, done):
+        while not done.wait(0.01):
+            if self._stopped():
+                self.tts.stop()
+                return
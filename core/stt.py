@@ -0,0 +1,584 @@
+import json
+import queue
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+from urllib3 import encode_multipart_formdata
+
+from . import audio, cancel, capture
+from .vad import VAD, SILENCE, END
+from .config import (AZURE_SPEECH_KEY, AZURE_REGION, DEEPGRAM_API_KEY,
+                     ASSEMBLYAI_API_KEY, OPENAI_API_KEY, SAMPLE_RATE, CHANNELS,
+                     MAX_RECORD_SECONDS, NO_SPEECH_SECONDS, DEEPGRAM_ENDPOINTING_MS,
+                     ASSEMBLYAI_POLL_BUDGET, VAD_HANGOVER_MS)
+
+
+# === Base adapter ===
+# Adapters are built once by the registry and kept warm; `warm()` creates
+# the provider client so the first turn does not pay for it. Streaming
+# adapters report interim text through `on_partial(text)`.
+class STT:
+    name = ""
+
+    def warm(self):
+        pass
+
+    def listen(self, stop=None, on_partial=None):
+        clip = audio.record_utterance(stop)
+        if not clip:
+            return None
+        return self.transcribe(clip, stop)
+
+    # `clip` is an audio.AudioClip; nothing is written to disk. REST
+    # adapters abort their upload or response on `stop`.
+    def transcribe(self, clip, stop=None):
+        raise NotImplementedError
+
+    def close(self):
+        session = getattr(self, "session", None)
+        if session is not None:
+            session.close()
+
+
+# === Azure STT (continuous recognition over a push stream) ===
+# One recognizer stays connected in continuous mode for the whole process.
+# During listen() the capture ring feeds it through a PushAudioInputStream,
+# so recognition runs while the user speaks; utterances come back through
+# the recognized event instead of a fresh recognize_once per turn.
+class AzureSTT(STT):
+    name = "azure"
+
+    def __init__(self, language="en-US", segment_silence_ms=VAD_HANGOVER_MS):
+        self.language = language
+        self.segment_silence_ms = segment_silence_ms
+        self.recognizer = None
+        self.push = None
+        self.results = queue.Queue()
+        self.on_partial = None
+        self.running = False
+
+    def warm(self):
+        import azure.cognitiveservices.speech as speechsdk
+        cfg = speechsdk.SpeechConfig(subscription=AZURE_SPEECH_KEY, region=AZURE_REGION)
+        cfg.speech_recognition_language = self.language
+        cfg.set_property(speechsdk.PropertyId.Speech_SegmentationSilenceTimeoutMs,
+                         str(self.segment_silence_ms))
+        fmt = speechsdk.audio.AudioStreamFormat(samples_per_second=SAMPLE_RATE,
+                                                bits_per_sample=16, channels=CHANNELS)
+        self.push = speechsdk.audio.PushAudioInputStream(stream_format=fmt)
+        audio_cfg = speechsdk.audio.AudioConfig(stream=self.push)
+        self.recognizer = speechsdk.SpeechRecognizer(speech_config=cfg, audio_config=audio_cfg)
+        self._recognized = speechsdk.ResultReason.RecognizedSpeech
+        self.recognizer.recognizing.connect(self._on_recognizing)
+        self.recognizer.recognized.connect(self._on_recognized)
+        self.recognizer.canceled.connect(self._on_canceled)
+        capture.get_engine()
+        self._start()
+
+    def _start(self):
+        self.recognizer.start_continuous_recognition_async().get()
+        self.running = True
+
+    def _on_recognizing(self, evt):
+        if self.on_partial and evt.result.text:
+            self.on_partial(evt.result.text)
+
+    def _on_recognized(self, evt):
+        if evt.result.reason == self._recognized and evt.result.text:
+            self.results.put(evt.result.text)
+
+    def _on_canceled(self, evt):
+        print("🔴 Azure STT canceled:", evt.result.cancellation_details.error_details)
+        self.running = False
+
+    def listen(self, stop=None, on_partial=None):
+        try:
+            if not self.running:
+                self._start()
+        except Exception as e:
+            print("🔴 Azure STT Error:", e)
+            return None
+        while not self.results.empty():     # drop utterances from before this turn
+            self.results.get_nowait()
+        self.on_partial = on_partial
+        engine = capture.get_engine()
+        reader = engine.reader()
+        chunk_s = engine.chunk / SAMPLE_RATE
+        vad = VAD()
+        vad.prime(engine.before(reader.pos, vad.window_ms))
+        heard = False
+        elapsed = 0.0
+        ended_at = None
+        try:
+            while True:
+                if stop is not None and stop.is_set():
+                    return None
+                try:
+                    return self.results.get_nowait()
+                except queue.Empty:
+                    pass
+                data = reader.read(engine.chunk_bytes)
+                if data is None or not self.running:
+                    break
+                self.push.write(bytes(data))
+                state = vad.feed(data)
+                heard = heard or state != SILENCE
+                elapsed += chunk_s
+                if state == END and ended_at is None:
+                    ended_at = elapsed
+                # Give Azure a moment after local endpointing to emit the result.
+                if ended_at is not None and elapsed - ended_at >= 1.5:
+                    break
+                if (not heard and elapsed >= NO_SPEECH_SECONDS) or elapsed >= MAX_RECORD_SECONDS:
+                    break
+            try:
+                return self.results.get(timeout=0.5 if heard else 0)
+            except queue.Empty:
+                if not heard:
+                    print("🔇 No speech detected")
+                return None
+        finally:
+            self.on_partial = None
+
+    def close(self):
+        if self.recognizer is not None and self.running:
+            self.recognizer.stop_continuous_recognition_async().get()
+            self.running = False
+        if self.push is not None:
+            self.push.close()
+
+
+# === Deepgram STT (prerecorded REST) ===
+class DeepgramSTT(STT):
+    name = "deepgram"
+    url  = "https://api.deepgram.com/v1/listen"
+
+    def __init__(self, model="nova-2"):
+        self.model = model
+        self.session = None
+
+    def warm(self):
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Token {DEEPGRAM_API_KEY}"
+
+    def transcribe(self, clip, stop=None):
+        try:
+            with self.session.post(self.url, data=cancel.body(clip.wav_bytes(), stop),
+                                   headers={"Content-Type": "audio/wav"},
+                                   params={"model": self.model, "punctuate": "true"},
+                                   stream=True) as resp, cancel.scope(stop, resp.close):
+                resp.raise_for_status()
+                result = resp.json()
+            return result["results"]["channels"][0]["alternatives"][0]["transcript"]
+        except Exception as e:
+            if not cancel.is_cancelled(stop):
+                print("🔴 Deepgram STT Error:", e)
+            return None
+
+
+# === Deepgram STT (live websocket) ===
+# Frames are sent from the capture ring while the user is still talking;
+# Deepgram's endpointing (speech_final / UtteranceEnd) closes the turn, so
+# the transcript is ready right after speech ends instead of after upload.
+class DeepgramLiveSTT(STT):
+    name = "deepgram_live"
+    url  = "wss://api.deepgram.com/v1/listen"
+
+    def __init__(self, model="nova-2", endpointing_ms=DEEPGRAM_ENDPOINTING_MS):
+        self.model = model
+        self.query = urlencode({
+            "model": model, "encoding": "linear16", "sample_rate": SAMPLE_RATE,
+            "channels": CHANNELS, "punctuate": "true", "interim_results": "true",
+            "endpointing": endpointing_ms, "utterance_end_ms": 1000, "vad_events": "true",
+        })
+        self.websocket = None
+
+    def warm(self):
+        import websocket
+        self.websocket = websocket
+        capture.get_engine()
+
+    def _connect(self):
+        return self.websocket.create_connection(
+            f"{self.url}?{self.query}",
+            header=[f"Authorization: Token {DEEPGRAM_API_KEY}"])
+
+    def _receive(self, ws, finals, state, done, on_partial):
+        try:
+            while not done.is_set():
+                message = ws.recv()
+                if not message:
+                    break
+                data = json.loads(message)
+                kind = data.get("type")
+                if kind == "SpeechStarted":
+                    state["speech"] = True
+                elif kind == "UtteranceEnd" and finals:
+                    done.set()
+                elif kind == "Results":
+                    text = data["channel"]["alternatives"][0]["transcript"]
+                    if text:
+                        state["speech"] = True
+                    if data.get("is_final"):
+                        if text:
+                            finals.append(text)
+                        if data.get("speech_final") and finals:
+                            done.set()
+                    elif text and on_partial:
+                        on_partial(" ".join(finals + [text]))
+        except Exception as e:
+            if not done.is_set():
+                print("🔴 Deepgram Live Error:", e)
+        finally:
+            done.set()
+
+    def listen(self, stop=None, on_partial=None):
+        engine = capture.get_engine()
+        reader = engine.reader()
+        chunk_s = engine.chunk / SAMPLE_RATE
+        finals, state, done = [], {"speech": False}, threading.Event()
+        try:
+            ws = self._connect()
+        except Exception as e:
+            print("🔴 Deepgram Live Connect Error:", e)
+            return None
+        receiver = threading.Thread(target=self._receive,
+                                    args=(ws, finals, state, done, on_partial), daemon=True)
+        receiver.start()
+        elapsed = 0.0
+
+        def abort():
+            # Wakes the receiver's recv() and the sender at once.
+            done.set()
+            ws.abort()
+
+        try:
+            with cancel.scope(stop, abort):
+                while not done.is_set():
+                    if stop is not None and stop.is_set():
+                        return None
+                    data = reader.read(engine.chunk_bytes)
+                    if data is None:
+                        break
+                    ws.send_binary(bytes(data))
+                    elapsed += chunk_s
+                    if not state["speech"] and elapsed >= NO_SPEECH_SECONDS:
+                        print("🔇 No speech detected")
+                        break
+                    if elapsed >= MAX_RECORD_SECONDS:
+                        break
+                ws.send(json.dumps({"type": "CloseStream"}))
+                if not done.is_set():
+                    done.wait(2.0)      # let Deepgram flush the last final
+        except Exception as e:
+            if not cancel.is_cancelled(stop):
+                print("🔴 Deepgram Live Error:", e)
+        finally:
+            done.set()
+            try:
+                ws.close()
+            except Exception:
+                pass
+        return " ".join(finals).strip() or None
+
+
+# === AssemblyAI STT (batch upload + poll) ===
+class AssemblyAISTT(STT):
+    name = "assemblyai"
+    base = "https://api.assemblyai.com/v2"
+
+    def __init__(self, poll_budget=ASSEMBLYAI_POLL_BUDGET):
+        self.session = None
+        self.poll_budget = poll_budget
+        self.ratio = 0.3            # learned processing seconds per audio second
+
+    def warm(self):
+        self.session = requests.Session()
+        self.session.headers["authorization"] = ASSEMBLYAI_API_KEY
+
+    def _upload(self, data):
+        upload = self.session.post(f"{self.base}/upload", data=data)
+        upload.raise_for_status()
+        return upload.json()["upload_url"]
+
+    # Completion is polled adaptively: the first check waits for the expected
+    # processing time (learned from earlier turns), then checks every 50 ms
+    # backing off to 500 ms, within a total latency budget.
+    def _wait(self, transcript_id, duration, stop=None):
+        t0 = time.perf_counter()
+        delay = max(0.05, 0.8 * self.ratio * duration)
+        interval = 0.05
+        while time.perf_counter() - t0 < self.poll_budget:
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return None
+            result = self.session.get(f"{self.base}/transcript/{transcript_id}").json()
+            if result["status"] == "completed":
+                if duration:
+                    spent = time.perf_counter() - t0
+                    self.ratio = 0.7 * self.ratio + 0.3 * (spent / duration)
+                return result["text"]
+            if result["status"] == "error":
+                print("🔴 AssemblyAI Error:", result["error"])
+                return None
+            delay, interval = interval, min(interval * 1.5, 0.5)
+        print("🔴 AssemblyAI: transcript not ready within budget")
+        return None
+
+    def _transcribe_url(self, audio_url, duration, stop=None):
+        transcript_id = self.session.post(f"{self.base}/transcript",
+                                          json={"audio_url": audio_url}).json()["id"]
+        return self._wait(transcript_id, duration, stop)
+
+    def transcribe(self, clip, stop=None):
+        try:
+            url = self._upload(cancel.body(clip.wav_bytes(), stop))
+            return self._transcribe_url(url, clip.duration, stop)
+        except Exception as e:
+            if not cancel.is_cancelled(stop):
+                print("🔴 AssemblyAI STT Error:", e)
+            return None
+
+    # The upload starts at speech onset and streams with chunked transfer
+    # encoding while the user is still talking, so only the tail is left
+    # to send when capture ends. A cancel wakes the body generator, which
+    # aborts the request, and listen() stops waiting for the uploader.
+    def listen(self, stop=None, on_partial=None):
+        chunks = queue.Queue()
+        result = {}
+
+        def body():
+            yield audio.AudioClip.stream_header()
+            while True:
+                chunk = chunks.get()
+                if cancel.is_cancelled(stop):
+                    raise cancel.Cancelled(stop.reason)
+                if chunk is None:
+                    return
+                yield chunk
+
+        def upload():
+            try:
+                with cancel.scope(stop, lambda: chunks.put(b"")):
+                    result["url"] = self._upload(body())
+            except Exception as e:
+                result["error"] = e
+
+        uploader = None
+
+        def on_frame(view):
+            nonlocal uploader
+            chunks.put(bytes(view))
+            if uploader is None:
+                uploader = threading.Thread(target=upload, daemon=True)
+                uploader.start()
+
+        try:
+            clip = audio.record_utterance(stop, on_frame=on_frame)
+        finally:
+            chunks.put(None)
+        if not clip or uploader is None:
+            return None
+        while uploader.is_alive() and not cancel.is_cancelled(stop):
+            uploader.join(0.05)
+        if cancel.is_cancelled(stop):
+            return None
+        if "error" in result:
+            print("🔴 AssemblyAI Upload Error:", result["error"])
+            return None
+        try:
+            return self._transcribe_url(result["url"], clip.duration, stop)
+        except Exception as e:
+            if not cancel.is_cancelled(stop):
+                print("🔴 AssemblyAI STT Error:", e)
+            return None
+
+
+# === AssemblyAI v3 streaming (persistent session) ===
+# One websocket for the life of the process: a background thread runs it and
+# reconnects with backoff. Audio is only sent while listen() is active, and
+# finished turns arrive on a queue, so a turn costs neither a handshake nor
+# a sleep-poll.
+class AssemblyAIStreamingSTT(STT):
+    name = "assemblyai_live"
+    url  = "wss://streaming.assemblyai.com/v3/ws"
+
+    def __init__(self, inactivity_timeout=3600, max_backoff=30.0):
+        self.query = urlencode({"sample_rate": SAMPLE_RATE, "encoding": "pcm_s16le",
+                                "format_turns": "true",
+                                "inactivity_timeout": inactivity_timeout})
+        self.max_backoff = max_backoff
+        self.turns = queue.Queue()
+        self.ready = threading.Event()
+        self.closed = threading.Event()
+        self.on_partial = None
+        self.ws = None
+        self.thread = None
+        self.stats = {"connects": 0, "reconnects": 0, "turns": 0}
+
+    def warm(self):
+        import websocket
+        self.websocket = websocket
+        capture.get_engine()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.ready.wait(5.0)
+
+    def _run(self):
+        backoff = 0.5
+        while not self.closed.is_set():
+            self.ws = self.websocket.WebSocketApp(
+                f"{self.url}?{self.query}",
+                header={"Authorization": ASSEMBLYAI_API_KEY},
+                on_message=self._on_message,
+                on_error=lambda ws, e: print("🔴 AssemblyAI WebSocket Error:", e))
+            self.stats["connects"] += 1
+            t0 = time.perf_counter()
+            self.ws.run_forever(ping_interval=20, ping_timeout=10)
+            self.ready.clear()
+            if self.closed.is_set():
+                break
+            if time.perf_counter() - t0 > 60:
+                backoff = 0.5           # the last session was healthy
+            self.stats["reconnects"] += 1
+            print(f"🔁 AssemblyAI reconnecting in {backoff:.1f}s")
+            self.closed.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _on_message(self, ws, message):
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        kind = data.get("type")
+        if kind == "Begin":
+            self.ready.set()
+        elif kind == "Turn":
+            text = data.get("transcript", "")
+            if data.get("end_of_turn") and data.get("turn_is_formatted", True):
+                self.stats["turns"] += 1
+                self.turns.put(text)
+            elif text and self.on_partial:
+                self.on_partial(text)
+        elif kind == "Termination":
+            self.ready.clear()
+
+    def listen(self, stop=None, on_partial=None):
+        if not self.ready.wait(5.0):
+            print("🔴 AssemblyAI session not connected")
+            return None
+        while not self.turns.empty():       # drop turns that ended between calls
+            self.turns.get_nowait()
+        self.on_partial = on_partial
+        engine = capture.get_engine()
+        reader = engine.reader()
+        chunk_s = engine.chunk / SAMPLE_RATE
+        vad = VAD()
+        vad.prime(engine.before(reader.pos, vad.window_ms))
+        heard = False
+        elapsed = 0.0
+        try:
+            while True:
+                if stop is not None and stop.is_set():
+                    return None
+                try:
+                    text = self.turns.get_nowait()
+                    if text:
+                        return text
+                except queue.Empty:
+                    pass
+                data = reader.read(engine.chunk_bytes)
+                if data is None or not self.ready.is_set():
+                    break
+                self.ws.send(bytes(data), self.websocket.ABNF.OPCODE_BINARY)
+                heard = heard or vad.feed(data) != SILENCE
+                elapsed += chunk_s
+                if (not heard and elapsed >= NO_SPEECH_SECONDS) or elapsed >= MAX_RECORD_SECONDS:
+                    break
+            # Out of time: ask the server to close the turn now.
+            if heard and self.ready.is_set():
+                self.ws.send(json.dumps({"type": "ForceEndpoint"}))
+                try:
+                    return self.turns.get(timeout=2.0) or None
+                except queue.Empty:
+                    pass
+            print("🔇 No speech detected")
+            return None
+        except Exception as e:
+            print("🔴 AssemblyAI Streaming Error:", e)
+            return None
+        finally:
+            self.on_partial = None
+
+    def close(self):
+        self.closed.set()
+        if self.ws is not None:
+            try:
+                self.ws.send(json.dumps({"type": "Terminate"}))
+            except Exception:
+                pass
+            self.ws.close()
+
+
+# === Whisper STT (OpenAI) ===
+class WhisperSTT(STT):
+    name = "whisper"
+
+    url = "https://api.openai.com/v1/audio/transcriptions"
+
+    def __init__(self, model="whisper-1"):
+        self.model = model
+        self.session = None
+
+    def warm(self):
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {OPENAI_API_KEY}"
+
+    # Plain REST rather than the SDK so the upload and response can be cut
+    # off on cancel like every other adapter.
+    def transcribe(self, clip, stop=None):
+        data, content_type = encode_multipart_formdata(
+            {"model": self.model, "file": ("audio.wav", clip.wav_bytes(), "audio/wav")})
+        try:
+            with self.session.post(self.url, data=cancel.body(data, stop),
+                                   headers={"Content-Type": content_type},
+                                   stream=True) as response, \
+                    cancel.scope(stop, response.close):
+                response.raise_for_status()
+                return response.json()["text"].strip()
+        except Exception as e:
+            if not cancel.is_cancelled(stop):
+                print("🔴 Whisper STT Error:", e)
+            return None
+
+
+# === SpeechRecognition STT (Google Web Speech) ===
+# Only the recognizer is used: audio comes from the shared capture engine
+# through STT.listen, never from an sr.Microphone of its own.
+class SpeechRecognitionSTT(STT):
+    name = "sr"
+
+    def __init__(self):
+        self.sr = None
+        self.recognizer = None
+
+    def warm(self):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+
+    # recognize_google cannot be interrupted; a cancel only skips the call.
+    def transcribe(self, clip, stop=None):
+        if cancel.is_cancelled(stop):
+            return None
+        sr = self.sr
+        try:
+            return self.recognizer.recognize_google(sr.AudioData(clip.pcm, clip.rate, clip.width))
+        except sr.UnknownValueError:
+            print("🔴 Could not understand audio")
+        except sr.RequestError as e:
+            print("🔴 SR Error:", e)
+        return None
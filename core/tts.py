@@ -0,0 +1,457 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+from . import cancel, devices
+from .audio import AudioClip
+from .config import (AZURE_SPEECH_KEY, AZURE_REGION, DEEPGRAM_API_KEY,
+                     SAMPLE_RATE, AZURE_VOICE, DEEPGRAM_VOICE, TTS_LOOKAHEAD)
+
+
+# === Base adapter ===
+# `speak` plays text end to end. Backends that can render to memory also
+# set `can_synthesize` and implement `synthesize(text) -> AudioClip`, which
+# lets the sentence pipeline render ahead and play through our own player.
+# Backends with their own utterance queue set `can_queue` and implement
+# `say(text) -> threading.Event` (set once the text has been spoken).
+# `synthesize(text, stop)` gives up as soon as the turn's token fires and
+# raises cancel.Cancelled rather than return a partial clip.
+# Backends that can play while the service is still rendering set
+# `can_stream`: their `speak(text, stop, on_audio)` streams to the player,
+# calls `on_audio()` at the first write and returns the complete clip (or
+# None if it was cut short), so a streamed segment can still be cached.
+class TTS:
+    name = ""
+    can_synthesize = False
+    can_queue = False
+    can_stream = False
+
+    def warm(self):
+        pass
+
+    def speak(self, text, stop=None):
+        raise NotImplementedError
+
+    def synthesize(self, text, stop=None):
+        raise NotImplementedError
+
+    def play(self, clip, stop=None):
+        devices.get_devices().play(clip.pcm, clip.rate, clip.channels, stop=stop)
+
+    # Passes chunks through while keeping a copy; `complete` is set only if
+    # the source ran to the end.
+    @staticmethod
+    def _record(chunks, parts, complete):
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        complete.set()
+
+    def _recorded(self, parts, complete, rate, stop):
+        if not complete.is_set() or cancel.is_cancelled(stop):
+            return None
+        return AudioClip(b"".join(parts), rate)
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# === Azure TTS ===
+# A small pool of synthesizers is built once at warm-up and each one is
+# pre-connected through the SDK Connection object, so a turn never pays for
+# SpeechConfig/SpeechSynthesizer construction or the service handshake.
+# Synthesizers render to memory (raw PCM at our playback rate); audio then
+# goes through our own player, pipeline or cache instead of the SDK speaker.
+class AzureTTS(TTS):
+    name = "azure"
+    can_synthesize = True
+    can_stream = True
+    rate = 16000
+    read_bytes = 3200  # 100 ms of 16 kHz mono PCM
+
+    def __init__(self, voice=AZURE_VOICE, pool_size=TTS_LOOKAHEAD + 1):
+        self.voice = voice
+        self.pool_size = pool_size
+        self.pool = queue.Queue()
+        self.connections = {}
+        self.disconnected = set()
+        self.active = set()
+        self._lock = threading.Lock()
+        self.stats = {"connects": 0, "reconnects": 0, "syntheses": 0}
+
+    def warm(self):
+        import azure.cognitiveservices.speech as speechsdk
+        self.sdk = speechsdk
+        cfg = speechsdk.SpeechConfig(subscription=AZURE_SPEECH_KEY, region=AZURE_REGION)
+        cfg.speech_synthesis_voice_name = self.voice
+        cfg.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Raw16Khz16BitMonoPcm)
+        for _ in range(self.pool_size):
+            synth = speechsdk.SpeechSynthesizer(speech_config=cfg, audio_config=None)
+            conn = speechsdk.Connection.from_speech_synthesizer(synth)
+            conn.disconnected.connect(lambda evt, s=synth: self._on_disconnected(s))
+            conn.open(True)
+            self.connections[synth] = conn
+            self.stats["connects"] += 1
+            self.pool.put(synth)
+        self._completed = speechsdk.ResultReason.SynthesizingAudioCompleted
+        self._started = speechsdk.ResultReason.SynthesizingAudioStarted
+        devices.get_devices().output(self.rate)
+
+    def _on_disconnected(self, synth):
+        with self._lock:
+            self.disconnected.add(synth)
+
+    @contextmanager
+    def _synthesizer(self):
+        synth = self.pool.get()
+        with self._lock:
+            stale = synth in self.disconnected
+            self.disconnected.discard(synth)
+            self.active.add(synth)
+        if stale:
+            # The service drops idle connections; reopen before use so the
+            # handshake is not hidden inside the first synthesis.
+            self.connections[synth].open(True)
+            self.stats["reconnects"] += 1
+        try:
+            yield synth
+        finally:
+            with self._lock:
+                self.active.discard(synth)
+            self.pool.put(synth)
+
+    def synthesize(self, text, stop=None):
+        with self._synthesizer() as synth, cancel.scope(stop, synth.stop_speaking_async):
+            result = synth.speak_text_async(text).get()
+        if cancel.is_cancelled(stop):
+            raise cancel.Cancelled(stop.reason)
+        if result.reason != self._completed:
+            raise RuntimeError(f"Azure synthesis failed: {result.reason}")
+        self.stats["syntheses"] += 1
+        return AudioClip(result.audio_data, self.rate)
+
+    # Reads audio from an in-memory stream while the service is still
+    # synthesizing and plays it through our player as it arrives.
+    def _chunks(self, stream):
+        buf = bytes(self.read_bytes)
+        while True:
+            n = stream.read_data(buf)
+            if not n:
+                return
+            yield buf[:n]
+
+    def speak(self, text, stop=None, on_audio=None):
+        if not text.strip():
+            print("🔴 TTS Error: Empty text")
+            return None
+        parts, complete = [], threading.Event()
+        try:
+            t0 = time.perf_counter()
+            with self._synthesizer() as synth, \
+                    cancel.scope(stop, synth.stop_speaking_async):
+                result = synth.start_speaking_text_async(text).get()
+                if result.reason not in (self._started, self._completed):
+                    raise RuntimeError(f"Azure synthesis failed: {result.reason}")
+                t_start = time.perf_counter() - t0
+                chunks = self._chunks(self.sdk.AudioDataStream(result))
+                first = devices.get_devices().play_stream(
+                    self._record(chunks, parts, complete), self.rate, stop=stop,
+                    on_audio=on_audio)
+            self.stats["syntheses"] += 1
+            if first is not None:
+                print(f"🔊 TTS first audio: {t_start + first:.2f}s, "
+                      f"total: {time.perf_counter() - t0:.2f}s")
+        except Exception as e:
+            if not cancel.is_cancelled(stop):
+                print("🔴 Azure TTS Error:", e)
+            return None
+        return self._recorded(parts, complete, self.rate, stop)
+
+    def stop(self):
+        with self._lock:
+            active = list(self.active)
+        for synth in active:
+            synth.stop_speaking_async()
+
+    def close(self):
+        for conn in self.connections.values():
+            try:
+                conn.close()
+            except Exception as e:
+                print("🔴 Close Error:", e)
+        self.connections.clear()
+
+
+# === Deepgram Aura TTS ===
+class DeepgramTTS(TTS):
+    name = "deepgram"
+    can_synthesize = True
+    can_stream = True
+    rate = SAMPLE_RATE
+    url  = "https://api.deepgram.com/v1/speak"
+
+    def __init__(self, voice=DEEPGRAM_VOICE, streaming=True):
+        self.voice = voice
+        self.streaming = streaming
+        self.session = None
+        self.active = set()
+        self._lock = threading.Lock()
+        self.params = {"model": voice, "encoding": "linear16",
+                       "sample_rate": SAMPLE_RATE, "container": "none"}
+
+    def warm(self):
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Token {DEEPGRAM_API_KEY}"
+        devices.get_devices().output(SAMPLE_RATE)
+
+    # One request, closed early if `stop` fires or stop() is called.
+    @contextmanager
+    def _request(self, text, stream, stop):
+        with self.session.post(self.url, params=self.params, json={"text": text},
+                               stream=stream) as response, cancel.scope(stop, response.close):
+            with self._lock:
+                self.active.add(response)
+            try:
+                response.raise_for_status()
+                yield response
+            finally:
+                with self._lock:
+                    self.active.discard(response)
+
+    def speak(self, text, stop=None, on_audio=None):
+        if not text.strip():
+            print("🔴 TTS Error: Empty text")
+            return None
+        parts, complete = [], threading.Event()
+        try:
+            t0 = time.perf_counter()
+            # Stream the body and play while it downloads instead of
+            # waiting for the whole response.content.
+            with self._request(text, self.streaming, stop) as response:
+                if self.streaming:
+                    t_headers = time.perf_counter() - t0
+                    chunks = response.iter_content(chunk_size=4096)
+                    first = devices.get_devices().play_stream(
+                        self._record(chunks, parts, complete), SAMPLE_RATE, stop=stop,
+                        on_audio=on_audio)
+                    first = None if first is None else t_headers + first
+                else:
+                    parts.append(response.content)
+                    complete.set()
+                    first = time.perf_counter() - t0
+                    if on_audio:
+                        on_audio()
+                    devices.get_devices().play(parts[0], SAMPLE_RATE, stop=stop)
+            if first is not None:
+                print(f"🔊 TTS first audio: {first:.2f}s, total: {time.perf_counter() - t0:.2f}s")
+        except Exception as e:
+            if not cancel.is_cancelled(stop):
+                print("🔴 Deepgram TTS Error:", e)
+            return None
+        return self._recorded(parts, complete, SAMPLE_RATE, stop)
+
+    def synthesize(self, text, stop=None):
+        with self._request(text, True, stop) as response:
+            pcm = response.content
+        if cancel.is_cancelled(stop):
+            raise cancel.Cancelled(stop.reason)
+        return AudioClip(pcm, SAMPLE_RATE)
+
+    def stop(self):
+        with self._lock:
+            active = list(self.active)
+        for response in active:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+
+# === pyttsx3 (offline) ===
+# The engine is not thread-safe, so it lives on one worker thread running
+# pyttsx3's external loop. Turns enqueue utterances and wait on a per-
+# utterance event; `stop` flushes the queue and cuts the current utterance
+# on the worker's next iteration (~10 ms).
+# With the "render" option ("pyttsx3:render") sentences are rendered with
+# save_to_file into a temp WAV and returned as clips instead, so offline
+# audio goes through the same pipeline, player and timings as cloud TTS.
+class Pyttsx3TTS(TTS):
+    name = "pyttsx3"
+    tick = 0.01
+    max_failures = 3        # consecutive driver errors before the worker stops
+    render_timeout = 30.0   # seconds synthesize() waits for one sentence
+
+    def __init__(self, mode=None):
+        if mode not in (None, "render"):
+            raise ValueError(f"Unknown pyttsx3 mode: {mode}")
+        self.can_synthesize = mode == "render"
+        self.can_queue = not self.can_synthesize
+        self.queue = queue.Queue()
+        self.pending = {}
+        self.flush = threading.Event()
+        self.ready = threading.Event()
+        self.running = False
+        self.worker = None
+        self.error = None
+        self.stats = {"utterances": 0, "stops": 0, "rendered": 0,
+                      "synth_seconds": 0.0, "audio_seconds": 0.0, "play_seconds": 0.0}
+
+    def warm(self):
+        self.running = True
+        self.worker = threading.Thread(target=self._run, daemon=True, name="pyttsx3")
+        self.worker.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.connect("finished-utterance", self._on_finished)
+            engine.startLoop(False)
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        uid = 0
+        failures = 0
+        try:
+            while self.running:
+                try:
+                    if self.flush.is_set():
+                        self.flush.clear()
+                        self._drain()
+                        engine.stop()
+                        self._finish_all()
+                    try:
+                        while True:
+                            text, path, done = self.queue.get_nowait()
+                            uid += 1
+                            self.pending[str(uid)] = done
+                            if path is None:
+                                engine.say(text, str(uid))
+                            else:
+                                engine.save_to_file(text, path, str(uid))
+                    except queue.Empty:
+                        pass
+                    engine.iterate()
+                    failures = 0
+                except Exception as e:
+                    # Fail the utterances in flight rather than leave their
+                    # waiters hanging; give up on a driver that keeps failing.
+                    print("🔴 pyttsx3 Error:", e)
+                    self._finish_all()
+                    failures += 1
+                    if failures >= self.max_failures:
+                        break
+                time.sleep(self.tick)
+            engine.endLoop()
+        except Exception as e:
+            print("🔴 pyttsx3 Error:", e)
+        finally:
+            self.running = False
+            self._drain()
+            self._finish_all()
+
+    def _on_finished(self, name, completed):
+        done = self.pending.pop(name, None)
+        if done is not None:
+            self.stats["utterances"] += 1
+            done.set()
+
+    def _drain(self):
+        try:
+            while True:
+                self.queue.get_nowait()[2].set()
+        except queue.Empty:
+            pass
+
+    def _finish_all(self):
+        for done in self.pending.values():
+            done.set()
+        self.pending.clear()
+
+    # Queues text behind anything already waiting and returns an event that
+    # is set when the utterance finishes or is flushed.
+    def say(self, text, path=None):
+        done = threading.Event()
+        if not self.running:
+            done.set()
+            return done
+        self.queue.put((text, path, done))
+        if not self.running:    # the worker died after the check above
+            self._drain()
+        return done
+
+    def synthesize(self, text, stop=None):
+        fd, path = tempfile.mkstemp(prefix="pyttsx3-", suffix=".wav")
+        os.close(fd)
+        try:
+            t0 = time.perf_counter()
+            done = self.say(text, path)
+            while not done.wait(self.tick):
+                if cancel.is_cancelled(stop):
+                    self.stop()
+                    raise cancel.Cancelled(stop.reason)
+                if time.perf_counter() - t0 > self.render_timeout:
+                    self.stop()
+                    raise TimeoutError(f"pyttsx3 render took over {self.render_timeout:g}s")
+            with open(path, "rb") as f:
+                data = f.read()
+            if not data:
+                raise RuntimeError("pyttsx3 rendered no audio")
+            clip = AudioClip.from_wav(data)
+        finally:
+            os.remove(path)
+        self.stats["rendered"] += 1
+        self.stats["synth_seconds"] += time.perf_counter() - t0
+        self.stats["audio_seconds"] += clip.duration
+        return clip
+
+    def play(self, clip, stop=None):
+        t0 = time.perf_counter()
+        super().play(clip, stop)
+        self.stats["play_seconds"] += time.perf_counter() - t0
+
+    def report(self):
+        s = self.stats
+        return (f"utterances={s['utterances']} stops={s['stops']} rendered={s['rendered']} "
+                f"synth={s['synth_seconds']:.2f}s audio={s['audio_seconds']:.2f}s "
+                f"play={s['play_seconds']:.2f}s")
+
+    def speak(self, text, stop=None):
+        done = self.say(text)
+        while not done.wait(self.tick):
+            if stop is not None and stop.is_set():
+                self.stop()
+                break
+
+    def stop(self):
+        self.stats["stops"] += 1
+        self.flush.set()
+
+    def close(self):
+        self.running = False
+        if self.worker is not None:
+            self.worker.join(timeout=1.0)
+        if self.stats["rendered"]:
+            print("🗣 pyttsx3 stats:", self.report())
+
+
+# === Text only (no speech output) ===
+class NullTTS(TTS):
+    name = "none"
+
+    def speak(self, text, stop=None):
+        print("💬", text)
@@ -0,0 +1,134 @@
+import numpy as np
+
+from .config import (SAMPLE_RATE, VAD_THRESHOLD_DB, VAD_MARGIN_DB, VAD_HANGOVER_MS,
+                     VAD_PREROLL_MS, VAD_MIN_SPEECH_MS, VAD_NOISE_WINDOW_MS,
+                     BARGE_IN_MARGIN_DB, BARGE_IN_ECHO_MS, BARGE_IN_MIN_SPEECH_MS)
+
+SILENCE = "silence"
+SPEECH  = "speech"
+END     = "end"
+
+
+# === Energy VAD with hangover and pre-roll ===
+# Each PyAudio chunk is split into 10 ms sub-frames and scored in one NumPy
+# pass. The speech threshold tracks the room's noise floor, so a fan or
+# hum does not hold the turn open. The floor is a minimum-statistics
+# estimate: the 10th percentile of every sub-frame in the last few
+# seconds, voiced or not. Speech has enough pauses that its quietest tenth
+# sits near the room, while steady noise at any level becomes the floor
+# as soon as it fills the window.
+class VAD:
+    floor_percentile = 10
+
+    def __init__(self, rate=SAMPLE_RATE, threshold_db=VAD_THRESHOLD_DB,
+                 margin_db=VAD_MARGIN_DB, hangover_ms=VAD_HANGOVER_MS,
+                 preroll_ms=VAD_PREROLL_MS, min_speech_ms=VAD_MIN_SPEECH_MS,
+                 noise_window_ms=VAD_NOISE_WINDOW_MS):
+        self.rate = rate
+        self.sub = rate // 100                      # samples per 10 ms
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.hangover_ms = hangover_ms
+        self.preroll_ms = preroll_ms
+        self.min_speech_ms = min_speech_ms
+        self.window_ms = noise_window_ms
+        self.history = np.empty(max(1, noise_window_ms // 10), dtype=np.float32)
+        self.filled = 0
+        self.head = 0
+        self.noise_db = threshold_db - margin_db
+        self.reset()
+
+    # Starts a new utterance; the noise floor belongs to the room and is kept.
+    def reset(self):
+        self.state = SILENCE
+        self.speech_ms = 0.0
+        self.silence_ms = 0.0
+
+    def _track_floor(self, db):
+        size = len(self.history)
+        db = db[-size:]
+        end = self.head + len(db)
+        if end <= size:
+            self.history[self.head:end] = db
+        else:
+            split = size - self.head
+            self.history[self.head:] = db[:split]
+            self.history[:end - size] = db[split:]
+        self.head = end % size
+        self.filled = min(size, self.filled + len(db))
+        self.noise_db = float(np.percentile(self.history[:self.filled], self.floor_percentile))
+
+    # Learns the floor from audio captured before listening started, so the
+    # first chunks of a turn are already scored against the room.
+    def prime(self, pcm):
+        db = self.energy_db(pcm)
+        if db.size:
+            self._track_floor(db)
+
+    def energy_db(self, pcm):
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n = len(samples) // self.sub * self.sub
+        if n == 0:
+            return np.empty(0, dtype=np.float32)
+        frames = samples[:n].reshape(-1, self.sub).astype(np.float32)
+        rms = np.sqrt(np.mean(frames * frames, axis=1)) / 32768.0
+        return 20.0 * np.log10(np.maximum(rms, 1e-6))
+
+    def threshold(self):
+        return max(self.threshold_db, self.noise_db + self.margin_db)
+
+    def feed(self, pcm):
+        db = self.energy_db(pcm)
+        if not db.size:
+            return self.state
+        self._track_floor(db)
+        voiced = db > self.threshold()
+        chunk_ms = db.size * 10.0
+
+        if voiced.mean() >= 0.3:
+            self.speech_ms += chunk_ms
+            self.silence_ms = 0.0
+            if self.state == SILENCE and self.speech_ms >= self.min_speech_ms:
+                self.state = SPEECH
+        elif self.state == SPEECH:
+            self.silence_ms += chunk_ms
+            if self.silence_ms >= self.hangover_ms:
+                self.state = END
+        else:
+            self.speech_ms = 0.0
+        return self.state
+
+
+# === Barge-in detection ===
+# While a reply plays the mic also hears the speaker. That echo rises and
+# falls with the reply, so the noise floor cannot absorb it and a plain VAD
+# takes it for speech. Instead the first `echo_ms` of mic audio heard while
+# our output is audible is measured, and the speech threshold is put
+# `margin_db` above its loud end (95th percentile sub-frame). Nothing can
+# interrupt during that measurement.
+class BargeInDetector:
+    echo_percentile = 95
+
+    def __init__(self, margin_db=BARGE_IN_MARGIN_DB, echo_ms=BARGE_IN_ECHO_MS,
+                 min_speech_ms=BARGE_IN_MIN_SPEECH_MS, **vad_args):
+        self.vad = VAD(min_speech_ms=min_speech_ms, **vad_args)
+        self.margin_db = margin_db
+        self.echo_ms = echo_ms
+        self.echo = []
+        self.echo_db = None
+
+    # True once the user is talking over the reply.
+    def feed(self, pcm, playing):
+        if self.echo_db is None and playing:
+            db = self.vad.energy_db(pcm)
+            self.vad.prime(pcm)
+            self.echo.append(db)
+            if sum(len(d) for d in self.echo) * 10 >= self.echo_ms:
+                self.echo_db = float(np.percentile(np.concatenate(self.echo),
+                                                   self.echo_percentile))
+                self.vad.threshold_db = max(self.vad.threshold_db,
+                                            self.echo_db + self.margin_db)
+                self.echo = None
+            self.vad.reset()
+            return False
+        return self.vad.feed(pcm) == SPEECH
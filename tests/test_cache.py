@@ -0,0 +1,34 @@
+import pytest
+
+from core.cache import HashEmbedder, SemanticCache
+
+
+def cache():
+    return SemanticCache(threshold=0.9, capacity=16, ttl=3600, path=None, embed=HashEmbedder())
+
+
+def put(c, prompt, reply):
+    c.put(SemanticCache.scope("p", "m", prompt), prompt, reply)
+
+
+def get(c, prompt):
+    return c.get(SemanticCache.scope("p", "m", prompt), prompt)
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("pasta recipe with spinach", "pasta recipe without spinach"),
+    ("symptoms of type one diabetes", "symptoms of type two diabetes"),
+    ("is it safe to drink tap water", "is it not safe to drink tap water"),
+    ("what's 12 times 13", "what's 12 times 14"),
+    ("I like cats", "I don't like cats"),
+])
+def test_numbers_and_negations_never_share_a_reply(stored, asked):
+    c = cache()
+    put(c, stored, "reply")
+    assert get(c, asked) is None
+
+
+def test_rephrasing_hits():
+    c = cache()
+    put(c, "what's the capital of France", "Paris.")
+    assert get(c, "tell me the capital of France") == "Paris."
@@ -0,0 +1,43 @@
+from core.cache import HashEmbedder, ResponseCache, SemanticCache
+from core.llm import LLM
+from core.memory import ConversationMemory
+
+
+# Answers from the conversation so far, so a reused reply is easy to spot.
+class TopicLLM(LLM):
+    name = "stub"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def _chat(self, messages):
+        self.calls += 1
+        topic = next(m["content"] for m in reversed(messages)
+                     if m["role"] == "user" and m["content"] != "Why?")
+        return f"Because of {topic}."
+
+
+def adapter():
+    llm = TopicLLM()
+    llm.cache = ResponseCache(path=None)
+    llm.semantic = SemanticCache(threshold=0.9, capacity=16, path=None, embed=HashEmbedder())
+    llm.memory = ConversationMemory()
+    return llm
+
+
+def test_elliptical_follow_up_depends_on_context():
+    llm = adapter()
+    llm.chat("Tell me about Rome")
+    assert llm.chat("Why?") == "Because of Tell me about Rome."
+    llm.chat("Tell me about quantum computing")
+    assert llm.chat("Why?") == "Because of Tell me about quantum computing."
+    assert llm.calls == 4
+
+
+def test_same_conversation_is_a_hit():
+    llm = adapter()
+    llm.chat("Tell me about Rome")
+    llm.memory.clear()
+    llm.chat("Tell me about Rome")
+    assert llm.calls == 1
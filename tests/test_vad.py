@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from core.vad import VAD, BargeInDetector, SPEECH, END
+
+RATE = 16000
+CHUNK = 1024
+
+
+def noise(db, seconds, seed=0):
+    rms = 10 ** (db / 20) * 32768
+    samples = np.random.default_rng(seed).normal(0, rms, int(RATE * seconds))
+    return samples.clip(-32768, 32767).astype(np.int16)
+
+
+def bursts(seconds, start, end):
+    # 220 Hz tone gated at 4 Hz: syllable-like energy with short pauses.
+    t = np.arange(int(RATE * seconds)) / RATE
+    gate = (t >= start) & (t < end) & (np.sin(2 * np.pi * 4 * t) > -0.3)
+    return (0.3 * 32768 * np.sin(2 * np.pi * 220 * t) * gate).astype(np.int16)
+
+
+def tone(db, seconds, hz=440):
+    # Steady sine at `db` dBFS RMS: a crude stand-in for playback echo.
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (10 ** (db / 20) * np.sqrt(2) * 32768 * np.sin(2 * np.pi * hz * t)).astype(np.int16)
+
+
+def syllables(db, seconds, hz=440):
+    # The same tone gated on for ~0.4 s at a time, like a spoken reply.
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (tone(db, seconds, hz) * (np.sin(2 * np.pi * 1.5 * t) > -0.3)).astype(np.int16)
+
+
+def feed(vad, signal):
+    return [vad.feed(signal[i:i + CHUNK].tobytes()) for i in range(0, len(signal), CHUNK)]
+
+
+@pytest.mark.parametrize("db", [-50, -42, -35])
+def test_stationary_noise_is_not_speech(db):
+    states = feed(VAD(), noise(db, 10))
+    assert SPEECH not in states
+
+
+@pytest.mark.parametrize("db", [-50, -42, -35])
+def test_speech_over_noise_starts_and_ends(db):
+    mix = noise(db, 6).astype(np.int32) + bursts(6, 2, 4)
+    states = feed(VAD(), mix.clip(-32768, 32767).astype(np.int16))
+    onset = states.index(SPEECH) * CHUNK / RATE
+    assert 2.0 <= onset < 2.5
+    assert END in states
+    assert states.index(END) * CHUNK / RATE < 5.5
+
+
+def test_primed_floor_keeps_noise_out_from_the_first_chunk():
+    vad = VAD()
+    vad.prime(noise(-42, 2, seed=1).tobytes())
+    assert SPEECH not in feed(vad, noise(-42, 1, seed=2))
+
+
+def barge(detector, signal, playing=True):
+    for i in range(0, len(signal), CHUNK):
+        if detector.feed(signal[i:i + CHUNK].tobytes(), playing):
+            return i / RATE
+    return None
+
+
+@pytest.mark.parametrize("echo", [tone, syllables])
+@pytest.mark.parametrize("db", [-40, -30, -20])
+def test_playback_echo_alone_never_barges_in(echo, db):
+    assert barge(BargeInDetector(), echo(db, 5)) is None
+
+
+@pytest.mark.parametrize("db", [-40, -30, -20])
+def test_speech_over_playback_echo_barges_in(db):
+    # A sustained vowel, 2 s into the reply.
+    voice = np.concatenate([np.zeros(2 * RATE, dtype=np.int16), tone(-6, 2, hz=220)])
+    mix = tone(db, 4).astype(np.int32) + voice
+    onset = barge(BargeInDetector(), mix.clip(-32768, 32767).astype(np.int16))
+    assert onset is not None and 2.0 <= onset < 2.5